@@ -7,7 +7,7 @@ setup(
   url='https://github.com/nikitanovosibirsk/valeera',
   author='Nikita Tsvetkov',
   author_email='nikitanovosibirsk@yandex.com',
-  python_requires='>=3.6',
+  python_requires='>=3.7',
   license='MIT',
   packages=find_packages(),
   install_requires=[
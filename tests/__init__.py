@@ -3,13 +3,21 @@ from .test_any_validator import TestAnyValidator
 from .test_array_of_validator import TestArrayOfValidator
 from .test_array_validator import TestArrayValidator
 from .test_boolean_validator import TestBooleanValidator
+from .test_codegen import TestCodeGenerator
+from .test_compiler import TestCompiler
 from .test_enum_validator import TestEnumValidator
+from .test_files import TestFiles
 from .test_float_validator import TestFloatValidator
 from .test_integer_validator import TestIntegerValidator
+from .test_lazy import TestLazy
+from .test_memo import TestMemo
 from .test_null_validator import TestNullValidator
 from .test_number_validator import TestNumberValidator
 from .test_object_validator import TestObjectValidator
 from .test_one_of_validator import TestOneOfValidator
+from .test_parallel import TestParallel
 from .test_pointer import TestPointer
+from .test_stream import TestStream
 from .test_string_validator import TestStringValidator
 from .test_timestamp_validator import TestTimestampValidator
+from .test_validator import TestValidator
@@ -1,8 +1,11 @@
 import unittest
 import warnings
+from unittest.mock import patch
 
 from district42 import json_schema as schema
 
+from valeera import Validator
+from valeera.helpers import get_accepted_types, get_discriminator
 from .validator_testcase import ValidatorTestCase
 
 
@@ -47,6 +50,39 @@ class TestAnyOfValidator(ValidatorTestCase):
     self.assertValidationFails([],    schema.any_of(option1, option2, option3))
     self.assertValidationFails({},    schema.any_of(option1, option2, option3))
 
+  def test_it_validates_discriminated_options(self):
+    option1 = schema.object({'type': schema.string('created'), 'id': schema.integer})
+    option2 = schema.object({'type': schema.string('deleted'), 'id': schema.integer,
+                             'reason': schema.string})
+    option3 = schema.object({'type': schema.string('renamed'), 'name': schema.string})
+    union = schema.any_of(option1, option2, option3)
+
+    self.assertEqual(get_discriminator(union._params['options']),
+                     ('type', {'created': 0, 'deleted': 1, 'renamed': 2}))
+
+    self.assertValidationPasses({'type': 'created', 'id': 1},                  union)
+    self.assertValidationPasses({'type': 'deleted', 'id': 1, 'reason': 'spam'}, union)
+    self.assertValidationPasses({'type': 'renamed', 'name': 'banana'},         union)
+
+    self.assertValidationFails({'type': 'deleted', 'id': 1},  union)
+    self.assertValidationFails({'type': 'updated', 'id': 1},  union)
+    self.assertValidationFails({'type': ['created'], 'id': 1}, union)
+    self.assertValidationFails({'id': 1},                     union)
+    self.assertValidationFails('created',                     union)
+    self.assertValidationFails(None,                          union)
+
+  def test_it_prepares_options_once(self):
+    union = schema.any_of(schema.integer, *[schema.object({'type': schema.string(str(i))})
+                                            for i in range(10)])
+    with patch('valeera.validator_visitor.get_discriminator',
+               side_effect=get_discriminator) as discriminator_mock, \
+         patch('valeera.validator_visitor.get_accepted_types',
+               side_effect=get_accepted_types) as types_mock:
+      errors = Validator().validate(list(range(100)) + [{'type': '1'}], schema.array.of(union))
+    self.assertEqual(errors.errors(), [])
+    self.assertEqual(discriminator_mock.call_count, 1)
+    self.assertEqual(types_mock.call_count, 11)
+
   def test_it_validates_nullable(self):
     with warnings.catch_warnings():
       warnings.simplefilter('ignore')
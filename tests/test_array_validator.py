@@ -1,8 +1,13 @@
 import unittest
 import warnings
+from unittest.mock import patch
 
 from district42 import json_schema as schema
 
+import valeera
+from valeera import Formatter, Validator, compile
+from valeera.helpers import parse_timestamp
+
 from .validator_testcase import ValidatorTestCase
 
 
@@ -51,6 +56,19 @@ class TestArrayValidator(ValidatorTestCase):
     self.assertValidationFails([{'id': 1}, {'id': 1}],
                                schema.array.unique(lambda a, b: a['id'] != b['id']))
 
+    self.assertValidationFails([{'a': [1, {'b': 2}]}, {'a': [1, {'b': 2}]}], schema.array.unique)
+
+  def test_it_reports_each_duplicate_group_once(self):
+    validator = Validator().validate([1, 2, 1, 3, 2, 1], schema.array.unique)
+    self.assertEqual([error.indices for error in validator.errors()], [[0, 2, 5], [1, 4]])
+
+    validator = Validator().validate([{'id': 1}, {'id': 2}, {'id': 1}, {'id': 1}],
+                                     schema.array.unique(lambda a, b: a['id'] != b['id']))
+    self.assertEqual([error.indices for error in validator.errors()], [[0, 2, 3]])
+
+    validator = Validator(Formatter()).validate([1, 2, 1], schema.array.unique)
+    self.assertEqual(validator.errors(), ['Array must be unique\nDuplicate elements #[0], #[2]'])
+
   def test_it_validates_length(self):
     self.assertValidationPasses([],         schema.array.empty)
     self.assertValidationPasses([None],     schema.array.non_empty)
@@ -105,6 +123,29 @@ class TestArrayValidator(ValidatorTestCase):
     self.assertValidationFails([False, False],              array_schema)
     self.assertValidationFails([],                          array_schema)
 
+    array_schema = schema.array.contains_all([schema.integer, schema.integer(1), schema.string,
+                                              schema.integer(2)])
+    self.assertValidationPasses([1, 'banana', 2], array_schema)
+
+    validator = Validator().validate([3, 1], array_schema)
+    self.assertEqual([error.expected_schema for error in validator.errors()],
+                     [array_schema._params['contains_all'][2],
+                      array_schema._params['contains_all'][3]])
+
+  def test_it_collects_only_competing_best_matches(self):
+    item = schema.object({'id': schema.integer, 'title': schema.string,
+                          'created_at': schema.timestamp})
+    actual = [{'id': '1', 'title': 'banana', 'created_at': '2020-01-01'}] + \
+             [{'id': '1', 'title': 1, 'created_at': '2020-01-01'}] * 50
+
+    for expected in [schema.array.contains(item), compile(schema.array.contains(item))]:
+      for module in [valeera.validator_visitor, valeera.compiler]:
+        with patch.object(module, 'parse_timestamp', wraps=parse_timestamp) as parse:
+          errors = Validator().validate(actual, expected).errors()
+        self.assertLessEqual(parse.call_count, 1)
+      self.assertEqual(errors[0].best_match['index'], 0)
+      self.assertEqual([error.path for error in errors[0].best_match['errors']], ['#[0].id'])
+
   def test_it_validates_nullable(self):
     with warnings.catch_warnings():
       warnings.simplefilter('ignore')
@@ -0,0 +1,84 @@
+import gc
+import linecache
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import CompiledSchema, Formatter, Validator
+from valeera.codegen import GeneratedSchema, generate
+
+
+class TestCodeGenerator(unittest.TestCase):
+
+  def test_it_generates_source(self):
+    generated = generate(schema.object({
+      'id':         schema.integer,
+      'title':      schema.string.pattern(r'^[a-z]+$'),
+      'created_at': schema.timestamp.iso.min('2020-01-01'),
+    }))
+
+    self.assertIsInstance(generated, GeneratedSchema)
+    self.assertIsInstance(generated, CompiledSchema)
+    self.assertIn("if 'id' in", generated.source)
+    self.assertIn("if 'title' in", generated.source)
+    self.assertIn('parse_timestamp(', generated.source)
+    self.assertNotIn('accept(', generated.source)
+
+  def test_it_releases_source_lines(self):
+    expected = schema.object({'id': schema.integer})
+    generated = [generate(expected), generate(expected)]
+    filenames = [compiled._check.__code__.co_filename for compiled in generated]
+    self.assertNotEqual(filenames[0], filenames[1])
+    self.assertTrue(all(filename in linecache.cache for filename in filenames))
+
+    del generated
+    gc.collect()
+    self.assertFalse(any(filename in linecache.cache for filename in filenames))
+
+  def test_it_falls_back_to_visitor(self):
+    predicate = lambda a, b: a['id'] != b['id']
+    generated = generate(schema.object({
+      'items': schema.array.of(schema.object({'id': schema.integer})).unique(predicate),
+    }))
+
+    self.assertIn('accept(', generated.source)
+    self.assertTrue(Validator().validate({'items': [{'id': 1}, {'id': 2}]}, generated).passes())
+    self.assertTrue(Validator().validate({'items': [{'id': 1}, {'id': 1}]}, generated).fails())
+
+  def test_it_produces_same_errors_as_visitor(self):
+    expected_schema = schema.object({
+      'id':      schema.integer.min(1),
+      'price':   schema.float.precision(2).between(0.0, 100.0),
+      'created': schema.timestamp.iso,
+      'tags':    schema.array.of(schema.string.alpha_num).length(1, 2),
+      'owner':   schema.any_of(schema.null, schema.object({'id': schema.integer}).strict),
+      'status':  schema.enum('active', 'deleted'),
+      'point':   schema.array([schema.integer, schema.integer]),
+    })
+    documents = [
+      {
+        'id': 1,
+        'price': 9.99,
+        'created': '2015-10-21T16:29:00+00:00',
+        'tags': ['banana'],
+        'owner': None,
+        'status': 'active',
+        'point': [0, 1],
+      },
+      {
+        'id': 0,
+        'price': 100.01,
+        'created': '21/10/2015',
+        'tags': ['?', 'banana', 'carrot'],
+        'owner': {'id': 1, 'name': 'Bob'},
+        'status': 'banana',
+        'point': [0],
+      },
+      {'tags': [], 'point': [0, 1, 2]},
+    ]
+
+    generated = generate(expected_schema)
+    for document in documents:
+      expected = Validator(Formatter()).validate(document, expected_schema).errors()
+      actual = Validator(Formatter()).validate(document, generated).errors()
+      self.assertEqual(actual, expected)
@@ -0,0 +1,61 @@
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import CompiledSchema, Formatter, Validator, compile
+
+
+class TestCompiler(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.object({
+      'id':     schema.integer.min(1),
+      'title':  schema.string.alpha_num.length(1, 8),
+      'price':  schema.float.precision(2).min(0.0),
+      'tags':   schema.array.of(schema.string).unique,
+      'author': schema.object({
+        'name':  schema.string,
+        'email': schema.string.contains('@') | schema.null,
+      }).strict,
+      'items':  schema.array.contains(schema.object({'id': schema.integer(42)})),
+    })
+
+  def test_it_compiles_schema(self):
+    compiled = compile(self.schema)
+    self.assertIsInstance(compiled, CompiledSchema)
+    self.assertIs(compiled.schema, self.schema)
+
+  def test_it_produces_same_errors_as_visitor(self):
+    documents = [
+      {
+        'id': 1,
+        'title': 'banana',
+        'price': 9.99,
+        'tags': ['fruit'],
+        'author': {'name': 'Bob', 'email': None},
+        'items': [{'id': 42}],
+      },
+      {
+        'id': 0,
+        'title': 'banana split',
+        'price': -1.0,
+        'tags': ['fruit', 'fruit', 42],
+        'author': {'name': None, 'email': 'bob', 'age': 42},
+        'items': [{'id': 1}, {}],
+      },
+      {'id': '1', 'tags': None, 'author': [], 'items': []},
+      None,
+    ]
+
+    compiled = compile(self.schema)
+    for document in documents:
+      expected = Validator(Formatter()).validate(document, self.schema).errors()
+      actual = Validator(Formatter()).validate(document, compiled).errors()
+      self.assertEqual(actual, expected)
+
+  def test_it_reuses_compiled_schema(self):
+    compiled = compile(schema.array.of(schema.integer))
+
+    self.assertTrue(Validator().validate([1, 2], compiled).passes())
+    self.assertTrue(Validator().validate(['1'], compiled).fails())
+    self.assertTrue(Validator().validate([], compiled).passes())
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import Formatter, Validator, validate_file
+from valeera.errors import (ValidationDecodeError, ValidationMinLengthError, ValidationTypeError,
+                            ValidationUniquenessError)
+from valeera.lazy import loads
+
+
+class TestFiles(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.object({
+      'id':   schema.integer,
+      'user': schema.object({'id': schema.integer}),
+    })
+    self.actuals = [{'id': index, 'user': {'id': index if index % 4 else str(index)}}
+                    for index in range(10)]
+
+  def write(self, content):
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, 'wb') as fileobj:
+      fileobj.write(content)
+    self.addCleanup(os.remove, path)
+    return path
+
+  def get_expected(self, actuals, content, records):
+    errors = Validator(Formatter()).validate(actuals, schema.array.of(self.schema)).errors()
+    return [(content.index(record), error) for record, error in zip(records, errors)]
+
+  def test_it_validates_ndjson_files(self):
+    lines = [json.dumps(actual).encode() for actual in self.actuals]
+    content = b'\n'.join(lines[:5]) + b'\n\n  ' + b'\n'.join(lines[5:])
+    path = self.write(content)
+
+    expected = self.get_expected(self.actuals, content, [lines[0], lines[4], lines[8]])
+    self.assertEqual(list(validate_file(path, self.schema, formatter=Formatter())), expected)
+    self.assertEqual([message.split()[1] for _, message in expected],
+                     ['#[0].user.id', '#[4].user.id', '#[8].user.id'])
+
+  def test_it_validates_array_files(self):
+    content = json.dumps(self.actuals, indent=1).encode()
+    path = self.write(content)
+    records = [json.dumps(self.actuals[index], indent=1).replace('\n', '\n ').encode()
+               for index in (0, 4, 8)]
+
+    expected = self.get_expected(self.actuals, content, records)
+    results = validate_file(path, schema.array.of(self.schema), 'array', Formatter())
+    self.assertEqual(list(results), expected)
+
+  def test_it_validates_files_in_parallel(self):
+    content = json.dumps(self.actuals).encode()
+    path = self.write(content)
+    expected = list(validate_file(path, schema.array.of(self.schema), 'array', Formatter()))
+    results = validate_file(path, schema.array.of(self.schema), 'array', Formatter(),
+                            workers=2, chunksize=3)
+    self.assertEqual(list(results), expected)
+    self.assertEqual(len(expected), 3)
+
+  def test_it_checks_array_length_and_uniqueness(self):
+    path = self.write(b'[1, "1", 1, [2, "]"]]')
+    errors = list(validate_file(path, schema.array.of(schema.integer).min_length(5).unique,
+                                'array'))
+    self.assertEqual([(offset, type(error), error.path) for offset, error in errors], [
+      (4, ValidationTypeError, '#[1]'),
+      (12, ValidationTypeError, '#[3]'),
+      (0, ValidationMinLengthError, '#'),
+      (0, ValidationUniquenessError, '#'),
+    ])
+
+  def test_it_reports_malformed_records(self):
+    path = self.write(b'{"id": 1}\n{"id": \n')
+    errors = list(validate_file(path, schema.object({'id': schema.integer})))
+    self.assertEqual([(offset, type(error), error.path) for offset, error in errors],
+                     [(10, ValidationDecodeError, '#[1]')])
+
+    for content, offset, path in [(b'[1, 2', 5, '#'), (b'[1, ]', 4, '#[1]'),
+                                  (b'[1] 2', 4, '#'), (b'', 0, '#')]:
+      errors = list(validate_file(self.write(content), schema.array.of(schema.integer), 'array'))
+      self.assertEqual([(offset, type(error), error.path) for offset, error in errors],
+                       [(offset, ValidationDecodeError, path)], content)
+
+  def test_it_stops_at_the_first_error(self):
+    path = self.write(json.dumps(self.actuals).encode())
+    errors = list(validate_file(path, schema.array.of(self.schema), 'array', fail_fast=True))
+    self.assertEqual(len(errors), 1)
+
+  def test_it_validates_mode_and_schema(self):
+    path = self.write(b'[]')
+    with self.assertRaises(ValueError):
+      validate_file(path, self.schema, 'json')
+    with self.assertRaises(TypeError):
+      validate_file(path, schema.array, 'array')
+    for kwargs in [{'workers': 0}, {'workers': 1.5}, {'chunksize': 0}, {'chunksize': None}]:
+      with self.assertRaises(ValueError, msg=kwargs):
+        validate_file(path, self.schema, **kwargs)
+
+  def test_it_sends_back_stripped_errors(self):
+    expected = schema.object({
+      'tags':  schema.array.of(schema.string).max_length(1),
+      'users': schema.array.contains(schema.object({'id': schema.integer(1)})),
+    })
+    self.assertFalse(expected == {})
+    loads('{}', expected)
+
+    actual = {'tags': ['a', 'b'], 'users': [{'id': 2, 'name': 'bob'}]}
+    path = self.write(json.dumps(actual).encode() + b'\n')
+    errors = list(validate_file(path, expected, workers=2))
+    self.assertEqual([(offset, error.format(Formatter())) for offset, error in errors],
+                     list(validate_file(path, expected, formatter=Formatter())))
+
+    length_error, occurrence_error = [error for _, error in errors]
+    self.assertIsNone(length_error.actual_val)
+    self.assertEqual(length_error.actual_type, 'list')
+    self.assertEqual([error.path for error in occurrence_error.best_match['errors']],
+                     ['#[0].users[0].id'])
@@ -0,0 +1,94 @@
+import json
+import pickle
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import Formatter, Validator
+from valeera.errors import ValidationDecodeError
+from valeera.lazy import RawValue, loads
+
+
+class TestLazy(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.object({
+      'id':    schema.integer,
+      'tags':  schema.array.of(schema.string),
+      'owner': schema.object({'name': schema.string}),
+    })
+    self.actual = {
+      'id':      1,
+      'tags':    ['a', 'b', 3],
+      'owner':   {'name': 'bob', 'friends': [{'name': '}'}, {'name': '"['}]},
+      'payload': {'items': [1, 2, [3, {'x': '\\"]}'}]], 'text': 'x' * 100},
+      'note':    'skip "me"',
+    }
+
+  def test_it_decodes_only_referenced_values(self):
+    actual = loads(json.dumps(self.actual).encode(), self.schema)
+    self.assertEqual(list(actual), list(self.actual))
+    self.assertEqual(actual['tags'], ['a', 'b', 3])
+    self.assertEqual(actual['owner']['name'], 'bob')
+    for value in (actual['payload'], actual['note'], actual['owner']['friends']):
+      self.assertIsInstance(value, RawValue)
+    self.assertEqual(actual['payload'].decode(), self.actual['payload'])
+    self.assertEqual(repr(actual['note']), json.dumps(self.actual['note']))
+
+  def test_it_validates_json(self):
+    content = json.dumps(self.actual, indent=2).encode('utf-16')
+    expected = Validator(Formatter()).validate(self.actual, self.schema).errors()
+    self.assertEqual(Validator(Formatter()).validate_json(content, self.schema).errors(), expected)
+    self.assertEqual(len(expected), 1)
+
+    strict = schema.object({'id': schema.integer}).strict.length(2)
+    for actual in [{'id': 1, 'x': [1]}, {'id': '1', 'x': {}, 'y': None}, [], None]:
+      expected = Validator(Formatter()).validate(actual, strict).errors()
+      errors = Validator(Formatter()).validate_json(json.dumps(actual), strict).errors()
+      self.assertEqual(errors, expected)
+
+  def test_it_decodes_arrays(self):
+    array_schema = schema.array([schema.integer, schema.object({'id': schema.integer})])
+    self.assertEqual(loads('[1, {"id": 2}, {"x": 3}]', array_schema), [1, {'id': 2}, {'x': 3}])
+
+    contains_schema = schema.array.contains(schema.object({'id': schema.integer(1)}))
+    actual = loads('[{"id": 1, "x": 2}]', contains_schema)
+    self.assertIsInstance(actual[0]['x'], RawValue)
+
+    actual = loads('[{"id": 1}, {"id": 1}]', schema.array.of(schema.object).unique)
+    self.assertEqual(actual, [{'id': 1}, {'id': 1}])
+
+  def test_it_reports_invalid_json(self):
+    for content in ['{"id": 1', '{"id" 1}', '{"id": 1, "x": [}', '{"x": "}', '{} {}', '']:
+      errors = Validator().validate_json(content, self.schema).errors()
+      self.assertEqual([type(error) for error in errors], [ValidationDecodeError], content)
+
+  def test_it_reports_invalid_skipped_values(self):
+    values = ['[1, }', '{"a": [1]]', '"x', '[1 @]', 'tru', '01', '[1, 2', '{"a": "}',
+              '[1 2 3]', '[1,,2]', '{"a" 1}', '{"a":1,}', '{,}', '[tru]', '[01]', '[1.]',
+              '["a":"b"]', '[-]', '["\\q"]', '["a\tb"]', '{"a": [1, {"b": 2,}]}',
+              '[[[[[[[1 2]]]]]]]', '[[[[[[[1, 2]]]]]],]']
+    for value in values:
+      for content in ['{{"id": 1, "payload": {}}}'.format(value),
+                      '{{"id": "1", "payload": {}}}'.format(value)]:
+        with self.assertRaises(ValueError, msg=value) as context:
+          json.loads(content)
+        errors = Validator().validate_json(content, self.schema).errors()
+        self.assertEqual([(type(error), error.message, error.actual_val) for error in errors],
+                         [(ValidationDecodeError, str(context.exception), None)], content)
+
+    content = '{"id": 1, "payload": [[[[[[[1, {"a": []}]]]]]], "x\\u00e9", -0.5e+3]}'
+    expected = schema.object({'id': schema.integer})
+    self.assertEqual(Validator().validate_json(content, expected).errors(), [])
+
+  def test_it_reports_skipped_values_as_decoded(self):
+    expected = schema.array.contains(schema.object({'id': schema.integer(1)}))
+    actual = [{'id': 2, 'x': 3, 'y': [True, None]}]
+    errors = Validator(Formatter()).validate_json(json.dumps(actual), expected).errors()
+    self.assertEqual(errors, Validator(Formatter()).validate(actual, expected).errors())
+    self.assertEqual(len(errors), 1)
+
+  def test_it_pickles_schema_after_decoding(self):
+    loads(json.dumps(self.actual), self.schema)
+    self.assertEqual(pickle.loads(pickle.dumps(self.schema)).__dict__.keys(),
+                     self.schema.__dict__.keys())
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+
+from district42 import json_schema as schema
+
+import valeera
+from valeera import Formatter, Memo, Validator, compile
+from valeera.helpers import parse_timestamp
+
+
+class TestMemo(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.array.of(schema.object({
+      'id':       schema.integer,
+      'currency': schema.object({
+        'code':  schema.string.length(3),
+        'scale': schema.integer,
+      }),
+    }))
+
+  def test_it_validates_repeated_values_once(self):
+    memo = Memo()
+    compiled = compile(self.schema, memo)
+    currency = {'code': 'USD', 'scale': 2}
+    actual = [{'id': index, 'currency': dict(currency)} for index in range(10)]
+
+    self.assertTrue(Validator().validate(actual, compiled).passes())
+    self.assertEqual(memo.hits, 9)
+    self.assertEqual(memo.stats()['size'], 1)
+
+    self.assertTrue(Validator().is_valid(actual, compiled))
+    self.assertTrue(Validator().is_valid(actual, compiled))
+    self.assertEqual(memo.hits, 9 + 9 + 10)
+
+  def test_it_skips_repeated_blocks(self):
+    author_schema = schema.object({'name': schema.string, 'joined': schema.timestamp})
+    expected = schema.array.of(schema.object({'id': schema.integer, 'author': author_schema}))
+    authors = [{'name': str(index), 'joined': '2015-10-2{}'.format(index)} for index in range(5)]
+    actual = [{'id': index, 'author': dict(authors[index % 5])} for index in range(2000)]
+
+    memo = Memo()
+    patch_parse = lambda module: patch.object(module, 'parse_timestamp', wraps=parse_timestamp)
+    with patch_parse(valeera.compiler) as parse, patch_parse(valeera.predicate_compiler) as probe:
+      plain = compile(expected)
+      self.assertTrue(Validator().validate(actual, plain).passes())
+      self.assertTrue(Validator().is_valid(actual, plain))
+      self.assertEqual((parse.call_count, probe.call_count), (2000, 2000))
+
+      parse.reset_mock()
+      probe.reset_mock()
+      compiled = compile(expected, memo)
+      self.assertTrue(Validator().validate(actual, compiled).passes())
+      self.assertTrue(Validator().is_valid(actual, compiled))
+      self.assertEqual((parse.call_count, probe.call_count), (5, 5))
+
+    self.assertEqual(memo.stats()['size'], 10)
+    self.assertEqual(memo.hits, 2 * 1995)
+
+  def test_it_reports_errors_of_repeated_values(self):
+    memo = Memo()
+    compiled = compile(self.schema, memo)
+    actual = [{'id': index, 'currency': {'code': 'USDT', 'scale': 2}} for index in range(3)]
+
+    errors = Validator(Formatter()).validate(actual, self.schema).errors()
+    self.assertEqual(len(errors), 3)
+    self.assertEqual(Validator(Formatter()).validate(actual, compiled).errors(), errors)
+    self.assertEqual(Validator(Formatter()).validate(actual, compiled).errors(), errors)
+
+  def test_it_distinguishes_value_types(self):
+    memo = Memo()
+    compiled = compile(schema.array.of(schema.array.of(schema.integer)), memo)
+
+    self.assertTrue(Validator().validate([[1], [1]], compiled).passes())
+    self.assertTrue(Validator().validate([[True], [1.0]], compiled).fails())
+    self.assertFalse(Validator().is_valid([[1], [True]], compiled))
+
+  def test_it_evicts_least_recently_used(self):
+    memo = Memo(maxsize=2)
+    compiled = compile(schema.array.of(schema.object({'id': schema.integer})), memo)
+
+    self.assertTrue(Validator().validate([{'id': 1}, {'id': 2}, {'id': 3}], compiled).passes())
+    self.assertEqual(len(memo), 2)
+
+    memo.clear()
+    self.assertEqual(memo.stats(), {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2})
+
+  def test_it_skips_schemas_with_predicate(self):
+    calls = []
+
+    def predicate(a, b):
+      calls.append((a, b))
+      return a != b
+
+    memo = Memo()
+    compiled = compile(schema.array.of(schema.object({
+      'xs': schema.array.of(schema.integer).unique(predicate),
+    })), memo)
+
+    actual = [{'xs': [1, 2]} for _ in range(5)]
+    self.assertTrue(Validator().validate(actual, compiled).passes())
+    self.assertEqual(calls, [(1, 2)] * 5)
+    self.assertEqual(memo.stats()['size'], 0)
+    self.assertEqual(memo.hits, 0)
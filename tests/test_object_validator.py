@@ -3,6 +3,8 @@ import warnings
 
 from district42 import json_schema as schema
 
+from valeera import Validator
+
 from .validator_testcase import ValidatorTestCase
 
 
@@ -168,3 +170,17 @@ class TestObjectValidator(ValidatorTestCase):
       self.assertValidationFails(0,     schema.object.nullable)
       self.assertValidationFails('',    schema.object.nullable)
       self.assertValidationFails([],    schema.object.nullable)
+
+  def test_it_reports_error_paths(self):
+    expected = schema.object({
+      'result': schema.object({
+        'items': schema.array.of(schema.object({'id': schema.integer}))
+      })
+    })
+    actual = {'result': {'items': [{'id': 1}, {'id': '2'}, {}]}}
+
+    errors = Validator().validate(actual, expected).errors()
+    self.assertEqual([error.path for error in errors], [
+      '#.result.items[1].id',
+      '#.result.items[2].id',
+    ])
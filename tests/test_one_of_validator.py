@@ -3,6 +3,7 @@ import warnings
 
 from district42 import json_schema as schema
 
+from valeera.helpers import get_accepted_types, get_discriminator
 from .validator_testcase import ValidatorTestCase
 
 
@@ -38,6 +39,58 @@ class TestOneOfValidator(ValidatorTestCase):
     self.assertValidationFails([],    schema.one_of(option1, option2, option3))
     self.assertValidationFails({},    schema.one_of(option1, option2, option3))
 
+  def test_it_validates_discriminated_options(self):
+    option1 = schema.object({'type': schema.string('created'), 'id': schema.integer})
+    option2 = schema.object({'type': schema.string('deleted'), 'id': schema.integer,
+                             'reason': schema.string})
+    option3 = schema.object({'type': schema.string('renamed'), 'name': schema.string})
+    union = schema.one_of(option1, option2, option3)
+
+    self.assertEqual(get_discriminator(union._params['options']),
+                     ('type', {'created': 0, 'deleted': 1, 'renamed': 2}))
+
+    self.assertValidationPasses({'type': 'created', 'id': 1},                  union)
+    self.assertValidationPasses({'type': 'deleted', 'id': 1, 'reason': 'spam'}, union)
+    self.assertValidationPasses({'type': 'renamed', 'name': 'banana'},         union)
+
+    self.assertValidationFails({'type': 'deleted', 'id': 1},  union)
+    self.assertValidationFails({'type': 'updated', 'id': 1},  union)
+    self.assertValidationFails({'type': ['created'], 'id': 1}, union)
+    self.assertValidationFails({'id': 1},                     union)
+    self.assertValidationFails('created',                     union)
+    self.assertValidationFails(None,                          union)
+
+  def test_it_detects_discriminators(self):
+    option1 = schema.object({'type': schema.string('a'), 'id': schema.integer})
+    option2 = schema.object({'type': schema.string('a'), 'id': schema.string})
+    self.assertIsNone(get_discriminator([option1, option2]))
+
+    option2 = schema.object({'type': schema.string('b').optional, 'id': schema.string})
+    self.assertIsNone(get_discriminator([option1, option2]))
+
+    option2 = schema.object({'type': schema.string, 'id': schema.string})
+    self.assertIsNone(get_discriminator([option1, schema.string]))
+    self.assertIsNone(get_discriminator([option1, option2]))
+
+    option2 = schema.object({'id': schema.string, 'type': schema.string('b')})
+    self.assertEqual(get_discriminator([option1, option2]), ('type', {'a': 0, 'b': 1}))
+
+  def test_it_skips_options_of_other_types(self):
+    self.assertEqual(get_accepted_types(schema.integer), frozenset([int]))
+    self.assertEqual(get_accepted_types(schema.object), frozenset([dict]))
+    self.assertEqual(get_accepted_types(schema.null), frozenset([type(None)]))
+    self.assertEqual(get_accepted_types(schema.enum(1, 'a')), frozenset([int, str]))
+    self.assertEqual(get_accepted_types(schema.one_of(schema.array, schema.string)),
+                     frozenset([list, str]))
+    self.assertIsNone(get_accepted_types(schema.undefined))
+
+    items_schema = schema.one_of(schema.integer, schema.string,
+                                 schema.object({'id': schema.integer}), schema.string.numeric)
+    self.assertValidationPasses([1, 'banana', {'id': 1}], schema.array.of(items_schema))
+    self.assertValidationFails([1, '42'],                schema.array.of(items_schema))
+    self.assertValidationFails([1, {'id': '1'}],         schema.array.of(items_schema))
+    self.assertValidationFails([1, None],                schema.array.of(items_schema))
+
   def test_it_validates_nullable(self):
     with warnings.catch_warnings():
       warnings.simplefilter('ignore')
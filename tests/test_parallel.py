@@ -0,0 +1,41 @@
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import Formatter, Validator, compile
+from valeera.parallel import validate_many
+
+
+class TestParallel(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.object({
+      'id':      schema.integer.min(1),
+      'created': schema.timestamp.min('2015-01-01'),
+      'tags':    schema.array.of(schema.string).unique,
+    })
+    self.actuals = [
+      {'id': index, 'created': '2015-10-21', 'tags': ['a', 'b'] if index % 7 else ['a', 'a']}
+      for index in range(100)
+    ]
+
+  def test_it_validates_documents_in_order(self):
+    expected = []
+    for actual in self.actuals:
+      validator = Validator().validate(actual, self.schema)
+      expected += [[(error.path, error.format(Formatter())) for error in validator.errors()]]
+
+    results = validate_many(self.actuals, self.schema, workers=2, chunksize=8)
+    self.assertEqual(list(results), expected)
+
+  def test_it_returns_failure_indices(self):
+    results = validate_many(iter(self.actuals), compile(self.schema), workers=2, chunksize=8,
+                            failures_only=True)
+    self.assertEqual(list(results), list(range(0, 100, 7)))
+
+  def test_it_validates_with_compared_schema(self):
+    self.assertTrue(self.schema == self.actuals[1])
+    self.assertFalse(self.schema == self.actuals[0])
+
+    results = validate_many(self.actuals, self.schema, workers=2, chunksize=8, failures_only=True)
+    self.assertEqual(list(results), list(range(0, 100, 7)))
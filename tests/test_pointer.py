@@ -91,3 +91,13 @@ class TestPointer(unittest.TestCase):
 
     self.assertEqual(origin_pointer.path(), '#')
     self.assertEqual(origin_pointer.value(), self.dictionary)
+
+  def test_it_raises_on_missing_value(self):
+    pointer = Pointer(self.dictionary, ['result', 'items', 2])
+    with self.assertRaises(IndexError):
+      pointer.value()
+
+    pointer = Pointer(self.dictionary).move('result').move('banana').move(0)
+    with self.assertRaises(KeyError):
+      pointer.value()
+    self.assertEqual(pointer.path(), '#.result.banana[0]')
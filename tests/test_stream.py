@@ -0,0 +1,98 @@
+import io
+import json
+import unittest
+
+from district42 import json_schema as schema
+
+from valeera import Formatter, Validator
+from valeera.errors import (ValidationDecodeError, ValidationMaxLengthError, ValidationTypeError,
+                            ValidationUniquenessError)
+from valeera.stream import iter_lines, validate_array, validate_lines
+
+
+class TestStream(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.object({'id': schema.integer, 'title': schema.string})
+    self.actuals = [{'id': index, 'title': 'banana' if index % 3 else index}
+                    for index in range(10)]
+    self.content = b'\n'.join(json.dumps(actual).encode() for actual in self.actuals) + b'\n'
+
+  def test_it_splits_lines_across_chunks(self):
+    lines = list(iter_lines(io.BytesIO(b'a\nbc\n\nd'), buffer_size=3))
+    self.assertEqual(lines, [(1, b'a'), (2, b'bc'), (3, b''), (4, b'd')])
+
+  def test_it_validates_lines(self):
+    expected = []
+    for line_number, actual in enumerate(self.actuals, start=1):
+      errors = Validator(Formatter()).validate(actual, self.schema).errors()
+      if errors:
+        expected += [(line_number, errors)]
+
+    results = validate_lines(io.BytesIO(self.content), self.schema, Formatter(), buffer_size=16)
+    self.assertEqual(list(results), expected)
+    self.assertEqual([line_number for line_number, _ in expected], [1, 4, 7, 10])
+
+  def test_it_reports_invalid_json(self):
+    content = b'{"id": 1, "title": "banana"}\r\n\n{"id": 2,\n'
+    results = list(validate_lines(io.BytesIO(content), self.schema))
+    self.assertEqual(len(results), 1)
+
+    line_number, errors = results[0]
+    self.assertEqual(line_number, 3)
+    self.assertIsInstance(errors[0], ValidationDecodeError)
+    self.assertEqual(errors[0].path, '#')
+
+  def test_it_validates_array_elements_incrementally(self):
+    expected = schema.array.of(self.schema).min_length(20)
+    content = json.dumps(self.actuals, indent=2).encode()
+
+    errors = list(validate_array(io.BytesIO(content), expected, Formatter(), buffer_size=7))
+    self.assertEqual(errors, Validator(Formatter()).validate(self.actuals, expected).errors())
+    self.assertEqual(len(errors), 5)
+
+  def test_it_reads_only_as_much_as_needed(self):
+    content = io.BytesIO(json.dumps(self.actuals).encode())
+    errors = validate_array(content, schema.array.of(self.schema), fail_fast=True, buffer_size=8)
+    self.assertEqual([error.path for error in errors], ['#[0].title'])
+    self.assertLess(content.tell(), len(content.getvalue()))
+
+  def test_it_checks_array_length_and_uniqueness(self):
+    content = br'  [1, 2, 1, 3.5e2, "\u00e9"]  '
+    expected = schema.array.of(schema.integer).max_length(3).unique
+    errors = list(validate_array(io.BytesIO(content), expected, buffer_size=2))
+    self.assertEqual([(type(error), error.path) for error in errors], [
+      (ValidationTypeError, '#[3]'),
+      (ValidationTypeError, '#[4]'),
+      (ValidationMaxLengthError, '#'),
+      (ValidationUniquenessError, '#'),
+    ])
+    self.assertEqual(errors[-1].indices, [0, 2])
+
+  def test_it_validates_non_array_documents(self):
+    expected = schema.array.of(schema.integer).nullable
+    self.assertEqual(list(validate_array(io.BytesIO(b'null'), expected)), [])
+    errors = list(validate_array(io.BytesIO(b'{}'), expected))
+    self.assertEqual([type(error) for error in errors], [ValidationTypeError])
+
+  def test_it_reports_malformed_arrays(self):
+    expected = schema.array.of(schema.integer)
+    for content, path in [(b'[1, 2', '#[2]'), (b'[1 2]', '#[1]'), (b'[1, }]', '#[1]'),
+                          (b'[1] 2', '#')]:
+      errors = list(validate_array(io.BytesIO(content), expected))
+      self.assertEqual([(type(error), error.path) for error in errors],
+                       [(ValidationDecodeError, path)], content)
+
+  def test_it_reports_syntax_errors_without_reading_further(self):
+    expected = schema.array.of(schema.integer)
+    for element, message in [(b'[1, }]', 'Expecting value (char 305)'),
+                             (b'"\\x"', 'Invalid \\escape (char 302)'),
+                             (b'1x', 'Expecting \',\' delimiter (char 302)')]:
+      content = io.BytesIO(b'[' + b'1, ' * 100 + element + b', 1' * 10000 + b']')
+      errors = list(validate_array(content, expected, buffer_size=8))
+      self.assertEqual([error.message for error in errors], [message], element)
+      self.assertLess(content.tell(), 1000)
+
+  def test_it_requires_array_of_schema(self):
+    with self.assertRaises(TypeError):
+      validate_array(io.BytesIO(b'[]'), schema.array)
@@ -3,6 +3,7 @@ import warnings
 
 from district42 import json_schema as schema
 
+from valeera.helpers import compile_pattern
 from .validator_testcase import ValidatorTestCase
 
 
@@ -85,6 +86,14 @@ class TestStringValidator(ValidatorTestCase):
     self.assertValidationFails('ID1234', schema.string.alpha_num.lowercase)
     self.assertValidationFails('id1234', schema.string.alpha_num.uppercase)
 
+  def test_it_reuses_compiled_patterns(self):
+    self.assertIs(compile_pattern(r'^[a-z]+$'), compile_pattern(r'^[a-z]+$'))
+
+    self.assertValidationPasses('banana', schema.string.pattern(r'^[a-z]+$'))
+    self.assertValidationPasses('banana', schema.string.pattern(r'^[a-z]+$'))
+    self.assertValidationFails('Banana',  schema.string.pattern(r'^[a-z]+$'))
+    self.assertValidationPasses('any\nvalue', schema.string.pattern(r'.*'))
+
   def test_it_validates_length(self):
     self.assertValidationPasses('',   schema.string.empty)
     self.assertValidationPasses(' ',  schema.string.non_empty)
@@ -1,8 +1,10 @@
 import unittest
 import warnings
 
+import delorean
 from district42 import json_schema as schema
 
+from valeera.helpers import parse_timestamp
 from .validator_testcase import ValidatorTestCase
 
 
@@ -40,6 +42,27 @@ class TestTimestampValidator(ValidatorTestCase):
 
     self.assertValidationFails('21 October 2015, 16:29:00', schema.timestamp.iso)
 
+  def test_it_parses_timestamps_like_delorean(self):
+    timestamps = [
+      '2015-10-21',
+      '2015-21-10',
+      '2015-10-12',
+      '2015-10-21T16:29',
+      '2015-10-21T16:29:00',
+      '2015-10-21 16:29:00.123',
+      '2015-10-21T16:29:00.123456789',
+      '2015-10-21T16:29:00Z',
+      '2015-10-21t16:29:00z',
+      '2015-10-21T16:29:00+03:00',
+      '2015-10-21T16:29:00-0530',
+      '21-10-2015 04:29 pm',
+    ]
+    for timestamp in timestamps:
+      self.assertEqual(parse_timestamp(timestamp), delorean.parse(timestamp).datetime, timestamp)
+
+    self.assertIsNone(parse_timestamp('2015-02-30'))
+    self.assertIsNone(parse_timestamp('banana'))
+
   def test_it_validates_min_value(self):
     self.assertValidationPasses('21/10/2015', schema.timestamp.min('21/10/2015'))
     self.assertValidationPasses('22/10/2015', schema.timestamp.min('21/10/2015'))
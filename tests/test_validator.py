@@ -0,0 +1,190 @@
+import asyncio
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
+
+from district42 import json_schema as schema
+
+from valeera import Formatter, Validator, compile, compile_predicate
+from valeera.cooperative import compile_cooperative
+
+
+class TestValidator(unittest.TestCase):
+
+  def setUp(self):
+    self.schema = schema.array.of(schema.object({
+      'id':    schema.integer,
+      'title': schema.string,
+    }))
+    self.actual = [{'id': '1', 'title': 1}, {'id': 2}, 3]
+
+  def test_it_stops_at_first_error(self):
+    errors = Validator(Formatter()).validate(self.actual, self.schema).errors()
+    self.assertEqual(len(errors), 4)
+
+    for expected in [self.schema, compile(self.schema)]:
+      validator = Validator(Formatter(), fail_fast=True).validate(self.actual, expected)
+      self.assertTrue(validator.fails())
+      self.assertEqual(validator.errors(), errors[:1])
+
+  def test_it_checks_validity(self):
+    for expected in [self.schema, compile(self.schema)]:
+      self.assertTrue(Validator().is_valid([{'id': 1, 'title': 'banana'}], expected))
+      self.assertFalse(Validator().is_valid(self.actual, expected))
+
+  def test_it_compares_schema(self):
+    self.assertTrue(self.schema == [{'id': 1, 'title': 'banana'}])
+    self.assertFalse(self.schema == self.actual)
+    self.assertIn({'id': 1}, [schema.object({'id': schema.integer})])
+
+  def test_it_caches_compiled_schema_for_comparison(self):
+    item_schema = schema.object({'id': schema.integer})
+    self.assertTrue(item_schema == {'id': 1})
+    is_valid = compile_predicate(item_schema)
+    self.assertTrue(item_schema == {'id': 2, 'title': 'banana'})
+    self.assertIs(compile_predicate(item_schema), is_valid)
+
+    item_schema.strict
+    self.assertFalse(item_schema == {'id': 2, 'title': 'banana'})
+
+    id_schema = schema.integer
+    array_schema = schema.array.of(id_schema)
+    self.assertTrue(array_schema == [1])
+    id_schema.min(2)
+    self.assertFalse(array_schema == [1])
+
+  def test_it_does_not_share_comparison_cache_with_copies(self):
+    item_schema = schema.object({'id': schema.integer})
+    self.assertTrue(item_schema == {'id': 1, 'title': 'banana'})
+
+    for clone in [copy(item_schema), deepcopy(item_schema)]:
+      self.assertTrue(clone == {'id': 1, 'title': 'banana'})
+
+    clone = deepcopy(item_schema).strict
+    self.assertFalse(clone == {'id': 1, 'title': 'banana'})
+    self.assertTrue(item_schema == {'id': 1, 'title': 'banana'})
+
+  def test_it_pickles_compared_schema(self):
+    item_schema = schema.object({'id': schema.integer, 'tags': schema.array.of(schema.string)})
+    self.assertTrue(item_schema == {'id': 1, 'tags': ['a']})
+
+    clone = pickle.loads(pickle.dumps(item_schema))
+    self.assertEqual(type(clone._params), dict)
+    self.assertTrue(clone == {'id': 1, 'tags': ['a']})
+    self.assertFalse(clone == {'id': 1, 'tags': [1]})
+
+    clone._params['keys']['tags']._params['items_schema'].numeric
+    self.assertFalse(clone == {'id': 1, 'tags': ['a']})
+    self.assertTrue(item_schema == {'id': 1, 'tags': ['a']})
+
+  def test_it_limits_number_of_errors(self):
+    actual = [str(index) for index in range(50)]
+    expected_schema = schema.array.of(schema.integer)
+    errors = Validator(Formatter()).validate(actual, expected_schema).errors()
+
+    for expected in [expected_schema, compile(expected_schema)]:
+      validator = Validator(Formatter(), max_errors=10).validate(actual, expected)
+      self.assertEqual(validator.errors(), errors[:10])
+      self.assertTrue(validator.truncated())
+
+      validator = Validator(Formatter(), max_errors=50).validate(actual, expected)
+      self.assertEqual(validator.errors(), errors)
+      self.assertFalse(validator.truncated())
+
+  def test_it_iterates_errors(self):
+    errors = Validator(Formatter()).validate(self.actual, self.schema).errors()
+
+    for expected in [self.schema, compile(self.schema)]:
+      iterator = Validator().iter_errors(self.actual, expected)
+      self.assertEqual(next(iterator).format(Formatter()), errors[0])
+      self.assertEqual([error.format(Formatter()) for error in iterator], errors[1:])
+
+  def test_it_builds_slotted_errors(self):
+    for expected in [self.schema, compile(self.schema)]:
+      errors = Validator().validate(self.actual, expected).errors()
+      for error in errors:
+        self.assertFalse(hasattr(error, '__dict__'))
+
+      self.assertEqual(errors[0].actual_val, '1')
+      self.assertEqual(errors[0].actual_type, 'str')
+      self.assertEqual(errors[-1].actual_type, 'int')
+
+  def test_it_validates_many_documents(self):
+    actuals = [[{'id': 1, 'title': 'banana'}], self.actual, [], 42]
+    expected_errors = [Validator(Formatter()).validate(actual, self.schema).errors()
+                       for actual in actuals]
+
+    for expected in [self.schema, compile(self.schema)]:
+      validator = Validator(Formatter())
+      self.assertEqual(validator.validate_many(actuals, expected), expected_errors)
+      self.assertEqual(validator.validate_many(iter(actuals), expected, failures_only=True), [1, 3])
+
+      validator = Validator(Formatter(), fail_fast=True)
+      self.assertEqual(validator.validate_many(actuals, expected),
+                       [errors[:1] for errors in expected_errors])
+
+  def run_async(self, coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+      return loop.run_until_complete(coroutine)
+    finally:
+      loop.close()
+
+  def test_it_validates_asynchronously(self):
+    actual = self.actual * 100
+    errors = Validator(Formatter()).validate(actual, self.schema).errors()
+    steps = []
+
+    async def count_steps():
+      while True:
+        steps.append(None)
+        await asyncio.sleep(0)
+
+    async def validate(validator, **kwargs):
+      task = asyncio.ensure_future(count_steps())
+      await validator.avalidate(actual, self.schema, **kwargs)
+      task.cancel()
+      return validator
+
+    validator = self.run_async(validate(Validator(Formatter()), yield_every=10))
+    self.assertEqual(validator.errors(), errors)
+    self.assertGreater(len(steps), 10)
+
+    validator = self.run_async(validate(Validator(Formatter(), max_errors=5), yield_every=10))
+    self.assertEqual(validator.errors(), errors[:5])
+    self.assertTrue(validator.truncated())
+
+    with ThreadPoolExecutor(1) as executor:
+      validator = self.run_async(validate(Validator(Formatter()), executor=executor,
+                                          offload_above=100))
+    self.assertEqual(validator.errors(), errors)
+
+  def test_it_yields_while_matching_options(self):
+    items = list(range(1000))
+    for actual, expected in [
+      (items,   schema.any_of(schema.array.of(schema.integer), schema.null)),
+      ([items], schema.array.contains(schema.array.of(schema.integer))),
+      ([items], schema.array.contains(schema.array.of(schema.string))),
+    ]:
+      steps = []
+
+      async def count_steps():
+        while True:
+          steps.append(None)
+          await asyncio.sleep(0)
+
+      async def validate():
+        task = asyncio.ensure_future(count_steps())
+        validator = await Validator(Formatter()).avalidate(actual, expected, yield_every=10)
+        task.cancel()
+        return validator
+
+      validator = self.run_async(validate())
+      errors = Validator(Formatter()).validate(actual, expected).errors()
+      self.assertEqual(validator.errors(), errors)
+      self.assertGreater(len(steps), 50, expected)
+
+  def test_it_compiles_cooperative_checks_once(self):
+    self.assertIs(compile_cooperative(self.schema)._check,
+                  compile_cooperative(compile(self.schema))._check)
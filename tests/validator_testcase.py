@@ -1,14 +1,30 @@
 import unittest
 
-from valeera import Formatter, Validator
+from valeera import Formatter, Validator, compile
+from valeera.codegen import generate
 
 
 class ValidatorTestCase(unittest.TestCase):
 
   def assertValidationPasses(self, actual, expected):
     validator = Validator(Formatter()).validate(actual, expected)
-    return self.assertEqual(validator.errors(), [])
+    self.assertEqual(validator.errors(), [])
+    self.assertTrue(Validator().is_valid(actual, expected))
+    self.assertEqual(Validator(fail_fast=True).validate(actual, expected).errors(), [])
+
+    for compiled in [compile(expected), generate(expected)]:
+      compiled_validator = Validator(Formatter()).validate(actual, compiled)
+      self.assertEqual(compiled_validator.errors(), [])
+      self.assertTrue(Validator().is_valid(actual, compiled))
 
   def assertValidationFails(self, actual, expected):
     validator = Validator(Formatter()).validate(actual, expected)
-    return self.assertNotEqual(validator.errors(), [])
+    self.assertNotEqual(validator.errors(), [])
+    self.assertFalse(Validator().is_valid(actual, expected))
+    fail_fast_validator = Validator(Formatter(), fail_fast=True).validate(actual, expected)
+    self.assertEqual(fail_fast_validator.errors(), validator.errors()[:1])
+
+    for compiled in [compile(expected), generate(expected)]:
+      compiled_validator = Validator(Formatter()).validate(actual, compiled)
+      self.assertEqual(compiled_validator.errors(), validator.errors())
+      self.assertFalse(Validator().is_valid(actual, compiled))
@@ -4,7 +4,11 @@ from .abstract_validator import AbstractValidator
 from .abstract_formatter import AbstractFormatter
 from .validator import Validator
 from .formatter import Formatter
+from .compiler import CompiledSchema, Compiler, compile
+from .predicate_compiler import PredicateCompiler, compile_predicate
+from .memo import Memo
+from .files import validate_file
 from .errors import *
 
 
-SchemaType.__eq__ = lambda self, other: Validator(Formatter()).validate(other, self).passes()
+SchemaType.__eq__ = lambda self, other: compile_predicate(self)(other)
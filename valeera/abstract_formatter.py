@@ -65,3 +65,6 @@ class AbstractFormatter:
 
   def format_enumeration_error(self, error):
     raise NotImplementedError()
+
+  def format_decode_error(self, error):
+    raise NotImplementedError()
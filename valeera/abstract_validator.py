@@ -2,6 +2,7 @@ class AbstractValidator:
 
   def __init__(self):
     self._errors = []
+    self._truncated = False
 
   def validate(self, actual, expected):
     raise NotImplementedError()
@@ -14,3 +15,6 @@ class AbstractValidator:
 
   def errors(self):
     return self._errors
+
+  def truncated(self):
+    return self._truncated
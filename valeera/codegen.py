@@ -0,0 +1,503 @@
+import linecache
+import weakref
+from itertools import count
+
+import district42.json_schema
+
+from .compiler import CompiledSchema
+from .errors import *
+from .helpers import *
+from .predicate_compiler import PredicateCompiler
+from .validator_visitor import ValidatorVisitor
+
+
+_filenames = count()
+
+
+class GeneratedSchema(CompiledSchema):
+
+  def __init__(self, schema, check, source):
+    super().__init__(schema, check)
+    self.source = source
+
+
+class CodeGenerator(district42.json_schema.AbstractVisitor):
+
+  def __init__(self):
+    self._namespace = {
+      'ValidatorVisitor': ValidatorVisitor,
+      'quantize': quantize,
+      'is_uri_valid': is_uri_valid,
+      'get_duplicates': get_duplicates,
+      'parse_timestamp': parse_timestamp,
+      'is_iso8601': is_iso8601,
+    }
+    for name, value in globals().items():
+      if name.startswith('Validation'):
+        self._namespace[name] = value
+    self._functions = []
+    self._lines = None
+    self._indent = 0
+    self._counter = 0
+    self._visitor_name = self.__constant(ValidatorVisitor())
+
+  def __name(self, prefix):
+    self._counter += 1
+    return '{}{}'.format(prefix, self._counter)
+
+  def __constant(self, value):
+    name = self.__name('c')
+    self._namespace[name] = value
+    return name
+
+  def __emit(self, line):
+    self._lines.append('  ' * self._indent + line)
+
+  def __emit_block(self, header, body):
+    self.__emit(header)
+    self._indent += 1
+    size = len(self._lines)
+    body()
+    if len(self._lines) == size:
+      self.__emit('pass')
+    self._indent -= 1
+
+  def __emit_chain(self, branches, otherwise=None):
+    # Each branch is (condition, statement); the first failing check ends the node,
+    # which mirrors the early returns of ValidatorVisitor
+    keyword = 'if'
+    for condition, statement in branches:
+      self.__emit('{} {}:'.format(keyword, condition))
+      self.__emit('  ' + (statement or 'pass'))
+      keyword = 'elif'
+    if otherwise is None:
+      return
+    if keyword == 'if':
+      return otherwise()
+
+    size = len(self._lines)
+    self.__emit('else:')
+    self._indent += 1
+    otherwise()
+    self._indent -= 1
+    if len(self._lines) == size + 1:
+      self._lines.pop()
+
+  def __emit_node(self, schema, value, pointer):
+    schema.accept(self, value, pointer)
+
+  def __emit_fallback(self, schema, value, pointer):
+    self.__emit('yield from {}.accept({}, {})'.format(self.__constant(schema),
+                                                      self._visitor_name, pointer))
+
+  def __get_type_name(self, valid_type):
+    if valid_type in (bool, int, float, str, list, dict):
+      return valid_type.__name__
+    return self.__constant(valid_type)
+
+  def __get_type_condition(self, value, valid_types):
+    type_names = [self.__get_type_name(valid_type) for valid_type in valid_types]
+    if len(type_names) == 1:
+      return 'type({}) is not {}'.format(value, type_names[0])
+    return 'type({}) not in ({})'.format(value, ', '.join(type_names))
+
+  def __get_type_branch(self, type_name, valid_types, value, pointer, is_nullable):
+    expected_types = [type_name, 'null'] if is_nullable else type_name
+    return (self.__get_type_condition(value, valid_types),
+            'yield ValidationTypeError({}, {}, {!r})'.format(pointer, value, expected_types))
+
+  def __get_nullable_branches(self, schema, value):
+    if 'nullable' in schema._params:
+      return [('{} is None'.format(value), None)]
+    return []
+
+  def __get_length_branches(self, schema, value, pointer):
+    branches = []
+    for name, operator, error_class in [('length', '!=', 'ValidationLengthError'),
+                                        ('min_length', '<', 'ValidationMinLengthError'),
+                                        ('max_length', '>', 'ValidationMaxLengthError')]:
+      if name in schema._params:
+        expected_length = self.__constant(schema._params[name])
+        branches += [(
+          'len({}) {} {}'.format(value, operator, expected_length),
+          'yield {}({}, {}, {})'.format(error_class, pointer, value, expected_length)
+        )]
+    return branches
+
+  def __emit_lengths(self, schema, value, pointer):
+    for condition, statement in self.__get_length_branches(schema, value, pointer):
+      self.__emit('if {}:'.format(condition))
+      self.__emit('  ' + statement)
+
+  def __emit_uniqueness(self, schema, value, pointer):
+    indices = self.__name('d')
+    self.__emit('for {} in get_duplicates({}):'.format(indices, value))
+    self.__emit('  yield ValidationUniquenessError({}, {}, {})'.format(pointer, value, indices))
+
+  def visit_null(self, schema, value, pointer):
+    self.__emit_chain([
+      ('{} is not None'.format(value),
+       'yield ValidationTypeError({}, {}, \'null\')'.format(pointer, value)),
+    ])
+
+  def visit_boolean(self, schema, value, pointer):
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('boolean', schema._valuable_types, value, pointer,
+                                        is_nullable)]
+    if 'value' in schema._params:
+      expected_val = self.__constant(schema._params['value'])
+      branches += [('{} != {}'.format(value, expected_val),
+                    'yield ValidationValueError({}, {}, {})'.format(pointer, value,
+                                                                           expected_val))]
+    self.__emit_chain(branches)
+
+  def visit_number(self, schema, value, pointer):
+    if 'float' in schema._params:
+      return self.__emit_float(schema, value, pointer)
+
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('number', schema._valuable_types, value, pointer,
+                                        is_nullable)]
+    if 'value' in schema._params:
+      expected_val = self.__constant(schema._params['value'])
+      branches += [('{} != {}'.format(value, expected_val),
+                    'yield ValidationValueError({}, {}, {}, \'int\')'.format(
+                      pointer, value, expected_val))]
+
+    def emit_comparisons():
+      if 'min_value' in schema._params:
+        min_value = self.__constant(schema._params['min_value'])
+        self.__emit('if {} < {}:'.format(value, min_value))
+        self.__emit('  yield ValidationMinValueError({}, {}, {}, \'int\')'.format(
+          pointer, value, min_value))
+      if 'max_value' in schema._params:
+        max_value = self.__constant(schema._params['max_value'])
+        self.__emit('if {} > {}:'.format(value, max_value))
+        self.__emit('  yield ValidationMaxValueError({}, {}, {}, \'int\')'.format(
+          pointer, value, max_value))
+      if 'multiple' in schema._params:
+        multiple = self.__constant(schema._params['multiple'])
+        self.__emit('if {} % {} != 0:'.format(value, multiple))
+        self.__emit('  yield ValidationRemainderError({}, {}, {})'.format(
+          pointer, value, multiple))
+
+    self.__emit_chain(branches, emit_comparisons)
+
+  def __emit_float(self, schema, value, pointer):
+    is_nullable = 'nullable' in schema._params
+    places = schema._params['precision'] if ('precision' in schema._params) else 9
+    decimal_format = '.{}f'.format(places)
+
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('number', schema._valuable_types, value, pointer,
+                                        is_nullable)]
+
+    def emit_comparisons():
+      actual_decimal = self.__name('d')
+      self.__emit('{} = quantize({}, {})'.format(actual_decimal, value, places))
+
+      comparisons = []
+      for name, operator, error_class in [('min_value', '<', 'ValidationMinValueError'),
+                                          ('max_value', '>', 'ValidationMaxValueError')]:
+        if name in schema._params:
+          expected_decimal = quantize(schema._params[name], places)
+          comparisons += [(operator, error_class, self.__constant(expected_decimal),
+                           repr(format(expected_decimal, decimal_format)))]
+
+      def emit_bounds():
+        for operator, error_class, expected_decimal, expected_formatted in comparisons:
+          self.__emit('if {} {} {}:'.format(actual_decimal, operator, expected_decimal))
+          self.__emit('  yield {}({}, format({}, {!r}), {}, \'float\')'.format(
+            error_class, pointer, actual_decimal, decimal_format, expected_formatted))
+
+      if 'value' in schema._params:
+        expected_decimal = quantize(schema._params['value'], places)
+        self.__emit_chain([(
+          '{} != {}'.format(actual_decimal, self.__constant(expected_decimal)),
+          'yield ValidationValueError({}, format({}, {!r}), {!r}, \'float\')'.format(
+            pointer, actual_decimal, decimal_format, format(expected_decimal, decimal_format))
+        )], emit_bounds if comparisons else None)
+      else:
+        emit_bounds()
+
+    self.__emit_chain(branches, emit_comparisons)
+
+  def visit_string(self, schema, value, pointer):
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('string', schema._valuable_types, value, pointer,
+                                        is_nullable)]
+
+    if 'value' in schema._params:
+      expected_val = self.__constant(schema._params['value'])
+      branches += [('{} != {}'.format(value, expected_val),
+                    'yield ValidationValueError({}, {}, {})'.format(pointer, value,
+                                                                           expected_val))]
+
+    if 'uri' in schema._params:
+      branches += [('not is_uri_valid({})'.format(value),
+                    'yield ValidationUriError({}, {})'.format(pointer, value))]
+
+    pattern = get_pattern(schema)
+    if pattern != any_pattern:
+      regex = self.__constant(compile_pattern(pattern))
+      branches += [('not {}.match({})'.format(regex, value),
+                    'yield ValidationPatternMismatchError({}, {}, {}.pattern)'.format(
+                      pointer, value, regex))]
+
+    if 'contains' in schema._params:
+      substring = self.__constant(schema._params['contains'])
+      branches += [('{} not in {}'.format(substring, value),
+                    'yield ValidationSubstringError({}, {}, {})'.format(pointer, value,
+                                                                               substring))]
+
+    for name, operator, error_class in [('numeric_min', '<', 'ValidationMinValueError'),
+                                        ('numeric_max', '>', 'ValidationMaxValueError')]:
+      if name in schema._params:
+        expected_val = schema._params[name]
+        branches += [(
+          'int({}) {} {!r}'.format(value, operator, expected_val),
+          'yield {}({}, \'"{{}}"\'.format({}), {!r})'.format(
+            error_class, pointer, value, '"{}"'.format(expected_val))
+        )]
+
+    branches += self.__get_length_branches(schema, value, pointer)
+    self.__emit_chain(branches)
+
+  def visit_timestamp(self, schema, value, pointer):
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('timestamp', schema._valuable_types, value, pointer,
+                                        is_nullable)]
+    timestamp_format = schema._params.get('format')
+    format_name = self.__constant(timestamp_format)
+
+    def emit_checks():
+      timestamp = self.__name('t')
+      self.__emit('{} = parse_timestamp({}, {})'.format(timestamp, value, format_name))
+      checks = [('{} is None'.format(timestamp),
+                 'yield ValidationTimestampError({}, {})'.format(pointer, value))]
+      if 'value' in schema._params:
+        expected_val = schema._params['value'].datetime
+        checks += [('{} != {}'.format(timestamp, self.__constant(expected_val)),
+                    'yield ValidationValueError({}, {}, {!r})'.format(
+                      pointer, value, expected_val.isoformat()))]
+
+      def emit_comparisons():
+        for name, operator, error_class in [('min_value', '<', 'ValidationMinValueError'),
+                                            ('max_value', '>', 'ValidationMaxValueError')]:
+          if name in schema._params:
+            expected_val = schema._params[name].datetime
+            self.__emit('if {} {} {}:'.format(timestamp, operator,
+                                              self.__constant(expected_val)))
+            self.__emit('  yield {}({}, {}, {!r})'.format(error_class, pointer, value,
+                                                           expected_val.isoformat()))
+        if 'iso' in schema._params:
+          self.__emit('if not is_iso8601({}):'.format(value))
+          self.__emit('  yield ValidationTimestampFormatError({}, {}, \'ISO 8601\')'.format(
+            pointer, value))
+        elif timestamp_format is not None:
+          self.__emit('if {} != {}.strftime({}):'.format(value, timestamp, format_name))
+          self.__emit('  yield ValidationTimestampFormatError({}, {}, {!r})'.format(
+            pointer, value, timestamp_format))
+
+      self.__emit_chain(checks, emit_comparisons)
+
+    self.__emit_chain(branches, emit_checks)
+
+  def visit_array(self, schema, value, pointer):
+    if any(name in schema._params for name in ['contains', 'contains_one', 'contains_many',
+                                                'contains_all', 'predicate']):
+      return self.__emit_chain(self.__get_nullable_branches(schema, value),
+                               lambda: self.__emit_fallback(schema, value, pointer))
+
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('array', [list], value, pointer, is_nullable)]
+
+    def emit_items():
+      if 'items' in schema._params:
+        items = schema._params['items']
+        for index, item_schema in enumerate(items):
+          item_pointer = '{}.move({})'.format(pointer, index)
+          item_value = self.__name('v')
+
+          def emit_item():
+            self.__emit('{} = {}[{}]'.format(item_value, value, index))
+            self.__emit_node(item_schema, item_value, item_pointer)
+
+          self.__emit_block('if len({}) > {}:'.format(value, index), emit_item)
+          self.__emit('else:')
+          self.__emit('  yield ValidationIndexError({})'.format(item_pointer))
+
+        self.__emit('if len({}) > {}:'.format(value, len(items)))
+        self.__emit('  yield ValidationLengthError({}, {}, {})'.format(pointer, value,
+                                                                            len(items)))
+
+      self.__emit_lengths(schema, value, pointer)
+      if 'unique' in schema._params:
+        self.__emit_uniqueness(schema, value, pointer)
+
+    self.__emit_chain(branches, emit_items)
+
+  def visit_array_of(self, schema, value, pointer):
+    if 'predicate' in schema._params:
+      return self.__emit_chain(self.__get_nullable_branches(schema, value),
+                               lambda: self.__emit_fallback(schema, value, pointer))
+
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('array', [list], value, pointer, is_nullable)]
+
+    def emit_items():
+      index, item_value = self.__name('i'), self.__name('v')
+      item_pointer = '{}.move({})'.format(pointer, index)
+      self.__emit_block('for {}, {} in enumerate({}):'.format(index, item_value, value),
+                        lambda: self.__emit_node(schema._params['items_schema'], item_value,
+                                                 item_pointer))
+      self.__emit_lengths(schema, value, pointer)
+      if 'unique' in schema._params:
+        self.__emit_uniqueness(schema, value, pointer)
+
+    self.__emit_chain(branches, emit_items)
+
+  def visit_object(self, schema, value, pointer):
+    is_nullable = 'nullable' in schema._params
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [self.__get_type_branch('object', [dict], value, pointer, is_nullable)]
+
+    def emit_keys():
+      keys = schema._params.get('keys')
+      for key, item_schema in (keys or {}).items():
+        item_pointer = '{}.move({!r})'.format(pointer, key)
+        if is_undefined(item_schema):
+          self.__emit('if {!r} in {}:'.format(key, value))
+          self.__emit('  yield ValidationExtraKeyError({}, {!r})'.format(item_pointer, key))
+          continue
+
+        item_value = self.__name('v')
+
+        def emit_key():
+          self.__emit('{} = {}[{!r}]'.format(item_value, value, key))
+          self.__emit_node(item_schema, item_value, item_pointer)
+
+        self.__emit_block('if {!r} in {}:'.format(key, value), emit_key)
+        if is_required(item_schema):
+          self.__emit('else:')
+          self.__emit('  yield ValidationMissingKeyError({})'.format(item_pointer))
+
+      if (keys is not None) and ('strict' in schema._params):
+        key, expected_keys = self.__name('k'), self.__constant(frozenset(keys))
+        self.__emit('for {} in {}:'.format(key, value))
+        self.__emit('  if {} not in {}:'.format(key, expected_keys))
+        self.__emit('    yield ValidationExtraKeyError({}, {})'.format(pointer, key))
+
+      self.__emit_lengths(schema, value, pointer)
+
+    self.__emit_chain(branches, emit_keys)
+
+  def visit_any(self, schema, value, pointer):
+    valid_types = '(bool, int, float, str, list, dict)'
+    expected_types = ['boolean', 'number', 'string', 'array', 'object']
+    condition = 'type({}) not in {}'.format(value, valid_types)
+    if 'nullable' in schema._params:
+      expected_types += ['null']
+      condition += ' and {} is not None'.format(value)
+    self.__emit_chain([
+      (condition, 'yield ValidationTypeError({}, {}, {!r})'.format(pointer, value,
+                                                                          expected_types)),
+    ])
+
+  def __emit_option_counter(self, schema, limit):
+    # Emits a module-level function counting matching options up to the limit;
+    # options are probed through their predicate form, so no errors are built,
+    # and options whose accepted types exclude the value are skipped without a call
+    name = self.__name('u')
+    lines = ['def {}(value):'.format(name), '  count = 0']
+    for option in schema._params['options']:
+      condition = '{}(value)'.format(self.__constant(option.accept(PredicateCompiler())))
+      accepted_types = get_accepted_types(option)
+      if accepted_types is not None:
+        condition = 'type(value) in {} and {}'.format(self.__constant(accepted_types), condition)
+      lines += ['  if {}:'.format(condition), '    count += 1']
+      lines += ['    if count == {}:'.format(limit), '      return count']
+    lines += ['  return count']
+    self._functions += [lines]
+    return name
+
+  def __get_dispatch_mismatch(self, schema, value):
+    # With a discriminator key at most one option can match, so the lookup
+    # table replaces the scan and the mismatch condition is the same for both unions
+    options = schema._params['options']
+    key, table = get_discriminator(options)
+    table_name = self.__constant({
+      option_value: options[index].accept(PredicateCompiler())
+      for option_value, index in table.items()
+    })
+
+    discriminant, predicate = self.__name('d'), self.__name('p')
+    self.__emit('{} = {}.get({!r}) if type({}) is dict else None'.format(discriminant, value, key,
+                                                                          value))
+    self.__emit('{} = {}.get({}) if type({}) is str else None'.format(predicate, table_name,
+                                                                       discriminant, discriminant))
+    return '({0} is None) or not {0}({1})'.format(predicate, value)
+
+  def visit_any_of(self, schema, value, pointer):
+    options = self.__constant(schema._params['options'])
+    if get_discriminator(schema._params['options']) is not None:
+      condition = self.__get_dispatch_mismatch(schema, value)
+    else:
+      condition = '{}({}) == 0'.format(self.__emit_option_counter(schema, 1), value)
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [(condition,
+                  'yield ValidationSchemaMismatchError({}, {}, {})'.format(pointer, value,
+                                                                                  options))]
+    self.__emit_chain(branches)
+
+  def visit_one_of(self, schema, value, pointer):
+    options = self.__constant(schema._params['options'])
+    if get_discriminator(schema._params['options']) is not None:
+      condition = self.__get_dispatch_mismatch(schema, value)
+    else:
+      condition = '{}({}) != 1'.format(self.__emit_option_counter(schema, 2), value)
+    branches = self.__get_nullable_branches(schema, value)
+    branches += [(condition,
+                  'yield ValidationSingleSchemaMismatchError({}, {}, {})'.format(
+                    pointer, value, options))]
+    self.__emit_chain(branches)
+
+  def visit_enum(self, schema, value, pointer):
+    enumerators = self.__constant(schema._params['enumerators'])
+    condition = 'not any(type(x) == type({0}) and x == {0} for x in {1})'.format(value,
+                                                                                 enumerators)
+    if 'nullable' in schema._params:
+      condition += ' and {} is not None'.format(value)
+    self.__emit_chain([
+      (condition, 'yield ValidationEnumerationError({}, {}, {})'.format(pointer, value,
+                                                                               enumerators)),
+    ])
+
+  def generate(self, schema):
+    name = self.__name('f')
+    self._lines, self._indent = ['def {}(pointer):'.format(name)], 1
+    value = self.__name('v')
+    self.__emit('{} = pointer.value()'.format(value))
+    self.__emit_node(schema, value, 'pointer')
+    self._functions += [self._lines]
+    source = '\n\n'.join('\n'.join(lines) for lines in self._functions) + '\n'
+
+    # Tracebacks read the source from linecache, so the entry is kept
+    # for exactly as long as the generated function
+    filename = '<valeera-codegen-{}>'.format(next(_filenames))
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, 'exec'), self._namespace)
+    check = self._namespace[name]
+    weakref.finalize(check, linecache.cache.pop, filename, None)
+
+    return GeneratedSchema(schema, check, source)
+
+
+def generate(schema):
+  return CodeGenerator().generate(schema)
@@ -0,0 +1,575 @@
+import district42.json_schema
+
+from .errors import *
+from .helpers import *
+from .predicate_compiler import PredicateCompiler
+
+
+class CompiledSchema:
+
+  def __init__(self, schema, check, memo = None):
+    self.schema = schema
+    self._check = check
+    self._memo = memo
+    self._is_valid = None
+
+  def __repr__(self):
+    return 'CompiledSchema({!r})'.format(self.schema)
+
+  def iter_errors(self, pointer):
+    return self._check(pointer)
+
+  def is_valid(self, actual):
+    if self._is_valid is None:
+      self._is_valid = self.schema.accept(PredicateCompiler(self._memo))
+    return self._is_valid(actual)
+
+
+class Compiler(district42.json_schema.AbstractVisitor):
+
+  # Repeated payload blocks are objects; memoizing the arrays around them
+  # would only canonicalize and store values that never repeat
+  memoized_types = (district42.json_schema.types.Object,)
+
+  def __init__(self, memo = None):
+    self._memo = memo
+
+  def _finalize(self, schema, check):
+    if (self._memo is None) or (type(schema) not in self.memoized_types):
+      return check
+    return self._memo.memoize_check(schema, check)
+
+  def __get_expected_types(self, type_name, is_nullable):
+    return [type_name, 'null'] if is_nullable else type_name
+
+  def __compile_length(self, schema):
+    checks = get_length_checks(schema)
+    if len(checks) == 0:
+      return None
+
+    def check_length(pointer, actual_val):
+      length = len(actual_val)
+      for error_class, comparator, expected_length in checks:
+        if not comparator(length, expected_length):
+          yield error_class(pointer, actual_val, expected_length)
+
+    return check_length
+
+  def __compile_uniqueness(self, schema):
+    if 'unique' not in schema._params:
+      return None
+
+    predicate = schema._params.get('predicate')
+
+    def check_uniqueness(pointer, actual_val):
+      for indices in get_duplicates(actual_val, predicate):
+        yield ValidationUniquenessError(pointer, actual_val, indices)
+
+    return check_uniqueness
+
+  def _compile_match(self, schema):
+    # Matches only answer yes or no; they are generators so that
+    # subclasses can yield while they run
+    is_valid = schema.accept(PredicateCompiler(self._memo))
+
+    def match(actual_val):
+      yield from ()
+      return is_valid(actual_val)
+
+    return match
+
+  def _collect_errors(self, errors, limit):
+    yield from ()
+    return collect_errors(errors, limit)
+
+  def __compile_occurrences(self, schema, limit):
+    item_matches = self._compile_match(schema)
+
+    def count_occurrences(pointer, array):
+      count = 0
+      for item in array:
+        if (yield from item_matches(item)):
+          count += 1
+          if count == limit:
+            break
+      return count
+
+    return count_occurrences, self.__compile_best_match(schema.accept(self))
+
+  def __compile_best_match(self, item_check):
+    def find_best_match(pointer, array):
+      best_match = BestMatch()
+      for index in range(len(array)):
+        errors = item_check(pointer.move(index))
+        best_match.add(index, (yield from self._collect_errors(errors, best_match.get_limit())))
+      return best_match.to_dict(array)
+
+    return find_best_match
+
+  def __compile_containment(self, schemas):
+    expected = []
+    for schema in schemas:
+      best_match = self.__compile_best_match(schema.accept(self))
+      expected += [(schema, self._compile_match(schema), best_match)]
+
+    def find_missing(pointer, array):
+      missing = expected
+      for item in array:
+        if len(missing) == 0:
+          break
+        still_missing = []
+        for entry in missing:
+          if not (yield from entry[1](item)):
+            still_missing += [entry]
+        missing = still_missing
+      return missing
+
+    return find_missing
+
+  def visit_null(self, schema):
+    def check(pointer):
+      actual_val = pointer.value()
+      if actual_val is not None:
+        yield ValidationTypeError(pointer, actual_val, 'null')
+
+    return self._finalize(schema, check)
+
+  def visit_boolean(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    expected_types = self.__get_expected_types('boolean', is_nullable)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) not in valid_types:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      if has_value and actual_val != expected_val:
+        yield ValidationValueError(pointer, actual_val, expected_val)
+
+    return self._finalize(schema, check)
+
+  def visit_number(self, schema):
+    if 'float' in schema._params:
+      return self.__compile_float(schema)
+
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    expected_types = self.__get_expected_types('number', is_nullable)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+    has_min_value = 'min_value' in schema._params
+    min_value = schema._params.get('min_value')
+    has_max_value = 'max_value' in schema._params
+    max_value = schema._params.get('max_value')
+    has_multiple = 'multiple' in schema._params
+    multiple = schema._params.get('multiple')
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) not in valid_types:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      if has_value and actual_val != expected_val:
+        yield ValidationValueError(pointer, actual_val, expected_val, 'int')
+        return
+
+      if has_min_value and actual_val < min_value:
+        yield ValidationMinValueError(pointer, actual_val, min_value, 'int')
+
+      if has_max_value and actual_val > max_value:
+        yield ValidationMaxValueError(pointer, actual_val, max_value, 'int')
+
+      if has_multiple and actual_val % multiple != 0:
+        yield ValidationRemainderError(pointer, actual_val, multiple)
+
+    return self._finalize(schema, check)
+
+  def __compile_float(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    expected_types = self.__get_expected_types('number', is_nullable)
+    places = schema._params['precision'] if ('precision' in schema._params) else 9
+    decimal_format = '.{}f'.format(places)
+
+    def quantize_param(name):
+      if name in schema._params:
+        return quantize(schema._params[name], places)
+      return None
+
+    expected_decimal = quantize_param('value')
+    min_decimal = quantize_param('min_value')
+    max_decimal = quantize_param('max_value')
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) not in valid_types:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      actual_decimal = quantize(actual_val, places)
+
+      if (expected_decimal is not None) and (actual_decimal != expected_decimal):
+        yield ValidationValueError(pointer,
+                                   format(actual_decimal, decimal_format),
+                                   format(expected_decimal, decimal_format), 'float')
+        return
+
+      if (min_decimal is not None) and (actual_decimal < min_decimal):
+        yield ValidationMinValueError(pointer,
+                                      format(actual_decimal, decimal_format),
+                                      format(min_decimal, decimal_format), 'float')
+
+      if (max_decimal is not None) and (actual_decimal > max_decimal):
+        yield ValidationMaxValueError(pointer,
+                                      format(actual_decimal, decimal_format),
+                                      format(max_decimal, decimal_format), 'float')
+
+    return self._finalize(schema, check)
+
+  def visit_string(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    expected_types = self.__get_expected_types('string', is_nullable)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+    is_uri = 'uri' in schema._params
+    pattern = get_pattern(schema)
+    is_pattern_match = None if pattern == any_pattern else compile_pattern(pattern).match
+    has_substring = 'contains' in schema._params
+    substring = schema._params.get('contains')
+    has_numeric_min = 'numeric_min' in schema._params
+    numeric_min = schema._params.get('numeric_min')
+    has_numeric_max = 'numeric_max' in schema._params
+    numeric_max = schema._params.get('numeric_max')
+    check_length = self.__compile_length(schema)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) not in valid_types:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      if has_value and actual_val != expected_val:
+        yield ValidationValueError(pointer, actual_val, expected_val)
+        return
+
+      if is_uri and not is_uri_valid(actual_val):
+        yield ValidationUriError(pointer, actual_val)
+        return
+
+      if is_pattern_match and not is_pattern_match(actual_val):
+        yield ValidationPatternMismatchError(pointer, actual_val, pattern)
+        return
+
+      if has_substring and substring not in actual_val:
+        yield ValidationSubstringError(pointer, actual_val, substring)
+        return
+
+      if has_numeric_min and int(actual_val) < numeric_min:
+        yield ValidationMinValueError(pointer,
+                                      '"{}"'.format(actual_val), '"{}"'.format(numeric_min))
+        return
+
+      if has_numeric_max and int(actual_val) > numeric_max:
+        yield ValidationMaxValueError(pointer,
+                                      '"{}"'.format(actual_val), '"{}"'.format(numeric_max))
+        return
+
+      if check_length:
+        for error in check_length(pointer, actual_val):
+          yield error
+          return
+
+    return self._finalize(schema, check)
+
+  def visit_timestamp(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    expected_types = self.__get_expected_types('timestamp', is_nullable)
+    timestamp_format = schema._params.get('format')
+    has_value = 'value' in schema._params
+    expected_val = schema._params['value'].datetime if has_value else None
+    has_min_value = 'min_value' in schema._params
+    min_value = schema._params['min_value'].datetime if has_min_value else None
+    has_max_value = 'max_value' in schema._params
+    max_value = schema._params['max_value'].datetime if has_max_value else None
+    is_iso = 'iso' in schema._params
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) not in valid_types:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      timestamp = parse_timestamp(actual_val, timestamp_format)
+      if timestamp is None:
+        yield ValidationTimestampError(pointer, actual_val)
+        return
+
+      if has_value and timestamp != expected_val:
+        yield ValidationValueError(pointer, actual_val, expected_val.isoformat())
+        return
+
+      if has_min_value and timestamp < min_value:
+        yield ValidationMinValueError(pointer, actual_val, min_value.isoformat())
+
+      if has_max_value and timestamp > max_value:
+        yield ValidationMaxValueError(pointer, actual_val, max_value.isoformat())
+
+      if is_iso:
+        if not is_iso8601(actual_val):
+          yield ValidationTimestampFormatError(pointer, actual_val, 'ISO 8601')
+      elif timestamp_format is not None:
+        if actual_val != timestamp.strftime(timestamp_format):
+          yield ValidationTimestampFormatError(pointer, actual_val, timestamp_format)
+
+    return self._finalize(schema, check)
+
+  def visit_array(self, schema):
+    is_nullable = 'nullable' in schema._params
+    expected_types = self.__get_expected_types('array', is_nullable)
+
+    items = None
+    occurrences = []
+    find_missing = None
+    if 'items' in schema._params:
+      items = [(index, item.accept(self)) for index, item in enumerate(schema._params['items'])]
+    elif 'contains' in schema._params:
+      item = schema._params['contains']
+      occurrences += [(ValidationMinOccurrenceError, item, 1, lambda count: count == 0,
+                       *self.__compile_occurrences(item, 1))]
+    elif 'contains_one' in schema._params:
+      item = schema._params['contains_one']
+      occurrences += [(ValidationExactlyOccurrenceError, item, 1, lambda count: count != 1,
+                       *self.__compile_occurrences(item, 2))]
+    elif 'contains_many' in schema._params:
+      item = schema._params['contains_many']
+      occurrences += [(ValidationMinOccurrenceError, item, 2, lambda count: count < 2,
+                       *self.__compile_occurrences(item, 2))]
+    elif 'contains_all' in schema._params:
+      find_missing = self.__compile_containment(schema._params['contains_all'])
+
+    check_length = self.__compile_length(schema)
+    check_uniqueness = self.__compile_uniqueness(schema)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) is not list:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      if items is not None:
+        for index, item_check in items:
+          if index < len(actual_val):
+            yield from item_check(pointer.move(index))
+          else:
+            yield ValidationIndexError(pointer.move(index))
+
+        if len(actual_val) > len(items):
+          yield ValidationLengthError(pointer, actual_val, len(items))
+
+      for error_class, item, expected_count, is_failed, counter, matcher in occurrences:
+        if is_failed((yield from counter(pointer, actual_val))):
+          best_match = yield from matcher(pointer, actual_val)
+          yield error_class(pointer, item, expected_count, best_match)
+
+      if find_missing:
+        for item, _, find_best_match in (yield from find_missing(pointer, actual_val)):
+          best_match = yield from find_best_match(pointer, actual_val)
+          yield ValidationMinOccurrenceError(pointer, item, 1, best_match)
+
+      if check_length:
+        yield from check_length(pointer, actual_val)
+
+      if check_uniqueness:
+        yield from check_uniqueness(pointer, actual_val)
+
+    return self._finalize(schema, check)
+
+  def visit_array_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    expected_types = self.__get_expected_types('array', is_nullable)
+    item_check = schema._params['items_schema'].accept(self)
+    check_length = self.__compile_length(schema)
+    check_uniqueness = self.__compile_uniqueness(schema)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) is not list:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      for index in range(len(actual_val)):
+        yield from item_check(pointer.move(index))
+
+      if check_length:
+        yield from check_length(pointer, actual_val)
+
+      if check_uniqueness:
+        yield from check_uniqueness(pointer, actual_val)
+
+    return self._finalize(schema, check)
+
+  def visit_object(self, schema):
+    is_nullable = 'nullable' in schema._params
+    expected_types = self.__get_expected_types('object', is_nullable)
+
+    keys = None
+    if 'keys' in schema._params:
+      keys = []
+      for key, item_schema in schema._params['keys'].items():
+        if is_undefined(item_schema):
+          keys += [(key, None, False)]
+        else:
+          keys += [(key, item_schema.accept(self), is_required(item_schema))]
+
+    is_strict = (keys is not None) and ('strict' in schema._params)
+    expected_keys = schema._params.get('keys')
+    check_length = self.__compile_length(schema)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      if type(actual_val) is not dict:
+        yield ValidationTypeError(pointer, actual_val, expected_types)
+        return
+
+      if keys is not None:
+        for key, item_check, required in keys:
+          if item_check is None:
+            if key in actual_val:
+              yield ValidationExtraKeyError(pointer.move(key), key)
+          elif key in actual_val:
+            yield from item_check(pointer.move(key))
+          elif required:
+            yield ValidationMissingKeyError(pointer.move(key))
+
+      if is_strict:
+        for key in actual_val.keys():
+          if key not in expected_keys:
+            yield ValidationExtraKeyError(pointer, key)
+
+      if check_length:
+        yield from check_length(pointer, actual_val)
+
+    return self._finalize(schema, check)
+
+  def visit_any(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = (bool, int, float, str, list, dict)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if type(actual_val) in valid_types:
+        return
+      if is_nullable and actual_val is None:
+        return
+
+      expected_types = ['boolean', 'number', 'string', 'array', 'object']
+      if is_nullable: expected_types.append('null')
+      yield ValidationTypeError(pointer, actual_val, expected_types)
+
+    return self._finalize(schema, check)
+
+  def visit_any_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    options = schema._params['options']
+    option_matchers = [(get_accepted_types(option), self._compile_match(option))
+                       for option in options]
+    discriminator = get_discriminator(options)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      candidates = option_matchers
+      if discriminator is not None:
+        index = get_discriminated_option(actual_val, discriminator)
+        candidates = [] if (index is None) else [option_matchers[index]]
+
+      for accepted_types, option_matches in candidates:
+        if is_type_accepted(actual_val, accepted_types) and \
+           (yield from option_matches(actual_val)):
+          return
+
+      yield ValidationSchemaMismatchError(pointer, actual_val, options)
+
+    return self._finalize(schema, check)
+
+  def visit_one_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    options = schema._params['options']
+    option_matchers = [(get_accepted_types(option), self._compile_match(option))
+                       for option in options]
+    discriminator = get_discriminator(options)
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if is_nullable and actual_val is None:
+        return
+
+      count = 0
+      candidates = option_matchers
+      if discriminator is not None:
+        index = get_discriminated_option(actual_val, discriminator)
+        candidates = [] if (index is None) else [option_matchers[index]]
+
+      for accepted_types, option_matches in candidates:
+        if is_type_accepted(actual_val, accepted_types) and \
+           (yield from option_matches(actual_val)):
+          count += 1
+          if count == 2:
+            break
+
+      if count != 1:
+        yield ValidationSingleSchemaMismatchError(pointer, actual_val, options)
+
+    return self._finalize(schema, check)
+
+  def visit_enum(self, schema):
+    is_nullable = 'nullable' in schema._params
+    enumerators = schema._params['enumerators']
+
+    def check(pointer):
+      actual_val = pointer.value()
+      if any(type(x) == type(actual_val) and x == actual_val for x in enumerators):
+        return
+      if is_nullable and actual_val is None:
+        return
+
+      yield ValidationEnumerationError(pointer, actual_val, enumerators)
+
+    return self._finalize(schema, check)
+
+
+def compile(schema, memo = None):
+  return CompiledSchema(schema, schema.accept(Compiler(memo)), memo)
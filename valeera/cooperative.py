@@ -0,0 +1,62 @@
+from .compiler import CompiledSchema, Compiler
+from .helpers import SchemaCache
+from .pointer import Pointer
+
+
+class Tick:
+
+  def __repr__(self):
+    return 'tick'
+
+
+tick = Tick()
+
+
+class CooperativeCompiler(Compiler):
+
+  def _finalize(self, schema, check):
+    check = super()._finalize(schema, check)
+
+    def check_cooperatively(pointer):
+      yield tick
+      yield from check(pointer)
+
+    return check_cooperatively
+
+  def _compile_match(self, schema):
+    # Options and contained items are matched with the ticking checks, so
+    # that the loop gets control back while a large candidate is checked
+    check = schema.accept(self)
+
+    def match(actual_val):
+      for error in check(Pointer(actual_val)):
+        if error is not tick:
+          return False
+        yield error
+      return True
+
+    return match
+
+  def _collect_errors(self, errors, limit):
+    collected = []
+    for error in errors:
+      if error is tick:
+        yield error
+        continue
+      collected += [error]
+      if (limit is not None) and (len(collected) > limit):
+        return None
+    return collected
+
+
+_checks = SchemaCache()
+
+
+def compile_cooperative(schema):
+  if isinstance(schema, CompiledSchema):
+    schema = schema.schema
+  check = _checks.get(schema)
+  if check is None:
+    check = schema.accept(CooperativeCompiler())
+    _checks.set(schema, check)
+  return CompiledSchema(schema, check)
@@ -1,15 +1,33 @@
 class ValidationError:
 
+  __slots__ = ('_path', 'actual_val', '_type_hint')
+
+  @property
+  def actual_type(self):
+    return self._get_type_as_string(self.actual_val, self._type_hint)
+
+  @property
+  def path(self):
+    if type(self._path) is not str:
+      self._path = self._path.path()
+    return self._path
+
+  @path.setter
+  def path(self, path):
+    self._path = path
+
   def _get_type_as_string(self, value, type_hint=None):
     return type_hint if type_hint else str(type(value))[8:-2]
 
 
 class ValidationTypeError(ValidationError):
 
+  __slots__ = ('expected_types',)
+
   def __init__(self, path, actual_val, expected_types, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val, type_hint)
+    self._type_hint = type_hint
     self.expected_types = expected_types if type(expected_types) is list else [expected_types]
 
   def format(self, formatter):
@@ -18,10 +36,12 @@ class ValidationTypeError(ValidationError):
 
 class ValidationValueError(ValidationError):
 
+  __slots__ = ('expected_val',)
+
   def __init__(self, path, actual_val, expected_val, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val, type_hint)
+    self._type_hint = type_hint
     self.expected_val = expected_val
 
   def format(self, formatter):
@@ -30,6 +50,8 @@ class ValidationValueError(ValidationError):
 
 class ValidationSubstringError(ValidationValueError):
 
+  __slots__ = ('expected_substring',)
+
   def __init__(self, path, actual_val, expected_substring):
     self.path = path
     self.actual_val = actual_val
@@ -41,10 +63,12 @@ class ValidationSubstringError(ValidationValueError):
 
 class ValidationMinValueError(ValidationValueError):
 
+  __slots__ = ('min_value',)
+
   def __init__(self, path, actual_val, min_value, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val, type_hint)
+    self._type_hint = type_hint
     self.min_value = min_value
   
   def format(self, formatter):
@@ -53,10 +77,12 @@ class ValidationMinValueError(ValidationValueError):
 
 class ValidationMaxValueError(ValidationValueError):
 
+  __slots__ = ('max_value',)
+
   def __init__(self, path, actual_val, max_value, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val, type_hint)
+    self._type_hint = type_hint
     self.max_value = max_value
   
   def format(self, formatter):
@@ -65,10 +91,12 @@ class ValidationMaxValueError(ValidationValueError):
 
 class ValidationRemainderError(ValidationValueError):
 
+  __slots__ = ('divisor',)
+
   def __init__(self, path, actual_val, divisor):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = None
     self.divisor = divisor
   
   def format(self, formatter):
@@ -76,6 +104,8 @@ class ValidationRemainderError(ValidationValueError):
 
 
 class ValidationUriError(ValidationValueError):
+
+  __slots__ = ()
   
   def __init__(self, path, actual_val):
     self.path = path
@@ -87,6 +117,8 @@ class ValidationUriError(ValidationValueError):
 
 class ValidationPatternMismatchError(ValidationValueError):
 
+  __slots__ = ('pattern',)
+
   def __init__(self, path, actual_val, pattern):
     self.path = path
     self.actual_val = actual_val
@@ -97,6 +129,8 @@ class ValidationPatternMismatchError(ValidationValueError):
 
 
 class ValidationTimestampError(ValidationValueError):
+
+  __slots__ = ()
   
   def __init__(self, path, actual_val):
     self.path = path
@@ -108,6 +142,8 @@ class ValidationTimestampError(ValidationValueError):
 
 class ValidationTimestampFormatError(ValidationValueError):
 
+  __slots__ = ('timestamp_format',)
+
   def __init__(self, path, actual_val, timestamp_format):
     self.path = path
     self.actual_val = actual_val
@@ -118,11 +154,13 @@ class ValidationTimestampFormatError(ValidationValueError):
 
 
 class ValidationLengthError(ValidationValueError):
+
+  __slots__ = ('length',)
   
-  def __init__(self, path, actual_val, length):
+  def __init__(self, path, actual_val, length, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = type_hint
     self.length = length
 
   def format(self, formatter):
@@ -130,11 +168,13 @@ class ValidationLengthError(ValidationValueError):
 
 
 class ValidationMinLengthError(ValidationLengthError):
+
+  __slots__ = ('min_length',)
   
-  def __init__(self, path, actual_val, min_length):
+  def __init__(self, path, actual_val, min_length, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = type_hint
     self.min_length = min_length
 
   def format(self, formatter):
@@ -142,11 +182,13 @@ class ValidationMinLengthError(ValidationLengthError):
 
 
 class ValidationMaxLengthError(ValidationLengthError):
+
+  __slots__ = ('max_length',)
   
-  def __init__(self, path, actual_val, max_length):
+  def __init__(self, path, actual_val, max_length, type_hint=None):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = type_hint
     self.max_length = max_length
 
   def format(self, formatter):
@@ -155,6 +197,8 @@ class ValidationMaxLengthError(ValidationLengthError):
 
 class ValidationIndexError(ValidationError):
 
+  __slots__ = ()
+
   def __init__(self, path):
     self.path = path
 
@@ -163,10 +207,13 @@ class ValidationIndexError(ValidationError):
 
 
 class ValidationOccurrenceError(ValidationError):
-  pass
+
+  __slots__ = ()
 
 
 class ValidationMinOccurrenceError(ValidationOccurrenceError):
+
+  __slots__ = ('expected_schema', 'min_count', 'best_match')
   
   def __init__(self, path, expected_schema, min_count, best_match=None):
     self.path = path
@@ -179,6 +226,8 @@ class ValidationMinOccurrenceError(ValidationOccurrenceError):
 
 
 class ValidationExactlyOccurrenceError(ValidationOccurrenceError):
+
+  __slots__ = ('expected_schema', 'exactly_count', 'best_match')
   
   def __init__(self, path, expected_schema, exactly_count, best_match=None):
     self.path = path
@@ -191,10 +240,13 @@ class ValidationExactlyOccurrenceError(ValidationOccurrenceError):
 
 
 class ValidationUniquenessError(ValidationValueError):
+
+  __slots__ = ('indices',)
   
-  def __init__(self, path, actual_val):
+  def __init__(self, path, actual_val, indices=None):
     self.path = path
     self.actual_val = actual_val
+    self.indices = indices
 
   def format(self, formatter):
     return formatter.format_uniqueness_error(self)
@@ -202,6 +254,8 @@ class ValidationUniquenessError(ValidationValueError):
 
 class ValidationMissingKeyError(ValidationError):
 
+  __slots__ = ()
+
   def __init__(self, path):
     self.path = path
 
@@ -211,6 +265,8 @@ class ValidationMissingKeyError(ValidationError):
 
 class ValidationExtraKeyError(ValidationError):
 
+  __slots__ = ('extra_key',)
+
   def __init__(self, path, extra_key):
     self.path = path
     self.extra_key = extra_key
@@ -221,10 +277,12 @@ class ValidationExtraKeyError(ValidationError):
 
 class ValidationSchemaMismatchError(ValidationTypeError):
 
+  __slots__ = ('options',)
+
   def __init__(self, path, actual_val, options):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = None
     self.options = options
 
   def format(self, formatter):
@@ -233,10 +291,12 @@ class ValidationSchemaMismatchError(ValidationTypeError):
 
 class ValidationSingleSchemaMismatchError(ValidationTypeError):
 
+  __slots__ = ('options',)
+
   def __init__(self, path, actual_val, options):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = None
     self.options = options
 
   def format(self, formatter):
@@ -245,11 +305,26 @@ class ValidationSingleSchemaMismatchError(ValidationTypeError):
 
 class ValidationEnumerationError(ValidationTypeError):
 
+  __slots__ = ('enumerators',)
+
   def __init__(self, path, actual_val, enumerators):
     self.path = path
     self.actual_val = actual_val
-    self.actual_type = self._get_type_as_string(actual_val)
+    self._type_hint = None
     self.enumerators = enumerators
 
   def format(self, formatter):
     return formatter.format_enumeration_error(self)
+
+
+class ValidationDecodeError(ValidationError):
+
+  __slots__ = ('message',)
+
+  def __init__(self, path, actual_val, message):
+    self.path = path
+    self.actual_val = actual_val
+    self.message = message
+
+  def format(self, formatter):
+    return formatter.format_decode_error(self)
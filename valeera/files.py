@@ -0,0 +1,238 @@
+import json
+import mmap
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import district42.json_schema
+
+from .compiler import CompiledSchema, compile
+from .errors import *
+from .helpers import iter_document_errors, iter_streamed_array_errors, map_ordered
+from .pointer import Pointer
+
+_token_regex = re.compile(rb'("(?:[^"\\]|\\.)*")|([\[{])|([\]}])|(,)|(")')
+
+_value_regex = re.compile(rb'[^ \t\n\r]')
+
+_worker = None
+
+
+@contextmanager
+def _open_mapped(path):
+  with open(path, 'rb') as fileobj:
+    # Empty files cannot be mapped, and an empty bytes object behaves the same
+    if os.fstat(fileobj.fileno()).st_size == 0:
+      yield b''
+      return
+    with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      yield mapped
+
+
+def _skip_whitespace(mapped, start, end):
+  match = _value_regex.search(mapped, start, end)
+  return end if (match is None) else match.start()
+
+
+def _iter_lines(mapped):
+  start = 0
+  while start < len(mapped):
+    end = mapped.find(b'\n', start)
+    if end < 0:
+      end = len(mapped)
+    offset = _skip_whitespace(mapped, start, end)
+    if offset < end:
+      yield offset, end
+    start = end + 1
+
+
+class _ArrayScanner:
+
+  def __init__(self, mapped, start):
+    self._mapped = mapped
+    self._start = start
+    self.count = 0
+    self.end = None
+    self.error = None
+
+  def __iter__(self):
+    # Only strings and brackets are tokenized, which is enough to find the
+    # commas that separate top-level elements; the elements themselves are
+    # decoded later, one slice at a time
+    mapped = self._mapped
+    depth = 0
+    start = self._start
+    for match in _token_regex.finditer(mapped, self._start):
+      kind = match.lastindex
+      if kind == 2:
+        depth += 1
+      elif (kind == 3) and (depth > 0):
+        depth -= 1
+      elif (kind == 3) or ((kind == 4) and (depth == 0)):
+        offset = _skip_whitespace(mapped, start, match.start())
+        if (kind == 4) or (offset < match.start()) or (self.count > 0):
+          self.count += 1
+          yield offset, match.start()
+        if kind == 3:
+          if mapped[match.start():match.end()] != b']':
+            self.error = (match.start(), 'Expecting \',\' delimiter')
+          self.end = match.end()
+          return
+        start = match.end()
+      elif kind == 5:
+        break
+    self.error = (len(mapped), 'Unexpected end of data')
+
+
+def _check_record(mapped, expected, root, index, offset, end):
+  data = mapped[offset:end]
+  try:
+    actual = json.loads(data.decode())
+  except ValueError as e:
+    return None, [ValidationDecodeError(root.attach(index, None), data, str(e))]
+  if expected.is_valid(actual):
+    return actual, []
+  return actual, list(expected.iter_errors(root.attach(index, actual)))
+
+
+# Formatters describe these errors without their values, which are
+# whole arrays and objects
+_valueless_errors = (ValidationLengthError, ValidationUniquenessError,
+                     ValidationSchemaMismatchError, ValidationSingleSchemaMismatchError)
+
+
+def _strip(error):
+  # Only what formatters read is sent back: paths are rendered so that the
+  # pointer chains into the decoded document are not pickled with them
+  error.path = error.path
+  if isinstance(error, _valueless_errors):
+    error._type_hint = error._get_type_as_string(error.actual_val,
+                                                 getattr(error, '_type_hint', None))
+    error.actual_val = None
+  best_match = getattr(error, 'best_match', None)
+  if best_match and best_match['errors']:
+    best_match['errors'] = [_strip(nested) for nested in best_match['errors']]
+  return error
+
+
+def _init_worker(path, schema_dump):
+  # Every worker reads the file on its own, so only byte ranges are sent to it
+  global _worker
+  _worker = (path, compile(pickle.loads(schema_dump)))
+
+
+def _check_records(records):
+  path, expected = _worker
+  root = Pointer(None)
+  results = []
+  with _open_mapped(path) as mapped:
+    for index, offset, end in records:
+      for error in _check_record(mapped, expected, root, index, offset, end)[1]:
+        results += [(offset, _strip(error))]
+  return results
+
+
+def _iter_record_errors(path, mapped, expected, records, workers, chunksize, items = None):
+  records = ((index, offset, end) for index, (offset, end) in enumerate(records))
+
+  if workers is None:
+    root = Pointer(None)
+    for index, offset, end in records:
+      actual, errors = _check_record(mapped, expected, root, index, offset, end)
+      for error in errors:
+        yield offset, error
+      if items is not None:
+        items += [actual]
+    return
+
+  executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(path, pickle.dumps(expected.schema)))
+  chunks = iter(lambda: list(islice(records, chunksize)), [])
+  results = map_ordered(executor, _check_records, chunks, workers * 2)
+  try:
+    for errors in results:
+      yield from errors
+  finally:
+    results.close()
+    executor.shutdown()
+
+
+def _iter_array_errors(path, mapped, expected, workers, chunksize):
+  root = Pointer(None)
+  start = _skip_whitespace(mapped, 0, len(mapped))
+
+  if mapped[start:start + 1] != b'[':
+    for error in iter_document_errors(expected, lambda: json.loads(mapped[start:].decode())):
+      yield start, error
+    return
+
+  # Uniqueness needs every element in one place, so unique arrays are
+  # validated in this process
+  is_unique = 'unique' in expected.schema._params
+  items = [] if is_unique else None
+  if is_unique:
+    workers = None
+
+  item_expected = compile(expected.schema._params['items_schema'], expected._memo)
+  scanner = _ArrayScanner(mapped, start + 1)
+  for offset, error in _iter_record_errors(path, mapped, item_expected, scanner, workers,
+                                           chunksize, items):
+    yield offset, error
+
+  if scanner.error is None:
+    offset = _skip_whitespace(mapped, scanner.end, len(mapped))
+    if offset < len(mapped):
+      scanner.error = (offset, 'Extra data')
+  if scanner.error is not None:
+    offset, message = scanner.error
+    yield offset, ValidationDecodeError(root, None, message)
+    return
+
+  for error in iter_streamed_array_errors(expected.schema, scanner.count, items):
+    yield start, error
+
+
+def _iter_file_errors(path, expected, mode, workers, chunksize):
+  with _open_mapped(path) as mapped:
+    if mode == 'ndjson':
+      yield from _iter_record_errors(path, mapped, expected, _iter_lines(mapped),
+                                     workers, chunksize)
+    else:
+      yield from _iter_array_errors(path, mapped, expected, workers, chunksize)
+
+
+def _format_errors(file_errors, errors, formatter):
+  try:
+    for offset, error in errors:
+      yield offset, error.format(formatter) if formatter else error
+  finally:
+    # Unmaps the file and stops the workers as soon as the caller is done
+    file_errors.close()
+
+
+def validate_file(path, schema, mode = 'ndjson', formatter = None, fail_fast = False,
+                  max_errors = None, workers = None, chunksize = 1000):
+  # Arguments are checked on the call rather than on the first iteration,
+  # so errors are produced by a separate generator
+  if mode not in ('ndjson', 'array'):
+    raise ValueError('mode must be \'ndjson\' or \'array\', {!r} given'.format(mode))
+  if (workers is not None) and ((type(workers) is not int) or (workers < 1)):
+    raise ValueError('workers must be a positive integer, {!r} given'.format(workers))
+  if (type(chunksize) is not int) or (chunksize < 1):
+    raise ValueError('chunksize must be a positive integer, {!r} given'.format(chunksize))
+
+  expected = schema if isinstance(schema, CompiledSchema) else compile(schema)
+  if (mode == 'array') and (type(expected.schema) is not district42.json_schema.types.ArrayOf):
+    raise TypeError('validate_file expects schema.array.of(...) in array mode, {!r} given'.format(
+                    expected.schema))
+
+  file_errors = _iter_file_errors(path, expected, mode, workers, chunksize)
+  errors = file_errors
+  if fail_fast:
+    errors = islice(errors, 1)
+  elif max_errors is not None:
+    errors = islice(errors, max_errors)
+  return _format_errors(file_errors, errors, formatter)
@@ -221,7 +221,14 @@ class Formatter(AbstractFormatter):
     if error.path != Pointer.root:
       message += ' ' + error.path
 
-    return message + ' must be unique'
+    message += ' must be unique'
+
+    if error.indices:
+      message += '\nDuplicate elements {}'.format(
+        ', '.join(error.path + '[{}]'.format(index) for index in error.indices)
+      )
+
+    return message
   
   def format_missing_key_error(self, error):
     return 'Key {} does not exist'.format(error.path)
@@ -264,3 +271,11 @@ class Formatter(AbstractFormatter):
       enumerators,
       repr(error.actual_val)
     )
+
+  def format_decode_error(self, error):
+    message = 'Value'
+    if error.path != Pointer.root:
+      message += ' ' + error.path
+
+    return message + ' must be valid JSON ({}), {} given'.format(error.message,
+                                                                  repr(error.actual_val))
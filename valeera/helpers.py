@@ -0,0 +1,533 @@
+import re
+import weakref
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from functools import lru_cache
+from operator import eq, ge, le, ne
+from sys import float_info
+
+import delorean
+import district42.json_schema
+
+from .errors import *
+from .pointer import Pointer
+
+_missing = object()
+
+
+def quantize(value, places, rounding=None):
+  if rounding is None:
+    rounding = ROUND_FLOOR if (value >= 0) else ROUND_CEILING
+  formatted_value = format(value, '.{}f'.format(float_info.dig))
+  return Decimal(formatted_value).quantize(Decimal(10) ** -places, rounding)
+
+
+any_pattern = r'.*'
+
+numeric_pattern = r'^\-?[0-9]+$'
+
+alphabetic_patterns = {
+  'lowercase': r'^[a-z]*$',
+  'uppercase': r'^[A-Z]*$',
+  None:        r'^[a-zA-Z]*$',
+}
+
+alpha_num_patterns = {
+  'lowercase': r'^[a-z0-9]*$',
+  'uppercase': r'^[A-Z0-9]*$',
+  None:        r'^[a-zA-Z0-9]*$',
+}
+
+iso8601_pattern = r'^([\+-]?\d{4}(?!\d{2}\b))((-?)((0[1-9]|1[0-2])(\3([12]\d|0[1-9]|3[01]))?|W([0-4]\d|5[0-2])(-?[1-7])?|(00[1-9]|0[1-9]\d|[12]\d{2}|3([0-5]\d|6[1-6])))([T\s]((([01]\d|2[0-3])((:?)[0-5]\d)?|24\:?00)([\.,]\d+(?!:))?)?(\17[0-5]\d([\.,]\d+)?)?([zZ]|([\+-])([01]\d|2[0-3]):?([0-5]\d)?)?)?)?$'
+
+iso8601_regex = re.compile(iso8601_pattern)
+
+
+def get_pattern(schema):
+  if 'pattern' in schema._params:
+    return schema._params['pattern']
+
+  if 'numeric' in schema._params:
+    return numeric_pattern
+
+  if 'lowercase' in schema._params:
+    case = 'lowercase'
+  elif 'uppercase' in schema._params:
+    case = 'uppercase'
+  else:
+    case = None
+
+  if 'alphabetic' in schema._params:
+    return alphabetic_patterns[case]
+
+  if 'alpha_num' in schema._params:
+    return alpha_num_patterns[case]
+
+  return any_pattern
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern):
+  return re.compile(pattern)
+
+
+def is_pattern_match(actual_val, pattern):
+  if pattern == any_pattern:
+    return True
+  return compile_pattern(pattern).match(actual_val) is not None
+
+
+def is_iso8601(actual_val):
+  return iso8601_regex.match(actual_val) is not None
+
+
+def is_uri_valid(actual_val):
+  from urllib.parse import urlparse
+  attrs = urlparse(actual_val)
+  return attrs.netloc or attrs.path
+
+
+timestamp_regex = re.compile(
+  r'^(\d{4})-(\d{2})-(\d{2})'
+  r'(?:[Tt ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?'
+  r'([Zz]|([\+-])(\d{2}):?(\d{2}))?)?$'
+)
+
+
+def parse_iso8601(actual_val):
+  match = timestamp_regex.match(actual_val)
+  if match is None:
+    return None
+
+  year, first, second, hour, minute, sec, fraction, _, sign, tz_hours, tz_minutes = match.groups()
+
+  # delorean.parse (and therefore district42) reads dates as year-day-month
+  # whenever that is a valid reading, so the fast path has to agree with it
+  if int(second) <= 12:
+    month, day = second, first
+  else:
+    month, day = first, second
+
+  if sign is None:
+    tzinfo = timezone.utc
+  else:
+    offset = timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+    tzinfo = timezone(offset if (sign == '+') else -offset)
+
+  return datetime(int(year), int(month), int(day),
+                  int(hour or 0), int(minute or 0), int(sec or 0),
+                  int(fraction.ljust(6, '0')) if fraction else 0, tzinfo)
+
+
+def parse_timestamp(actual_val, timestamp_format=None):
+  if timestamp_format is not None:
+    try:
+      dt = datetime.strptime(actual_val, timestamp_format)
+    except (TypeError, ValueError):
+      return None
+
+    if dt.tzinfo is None:
+      return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+  if type(actual_val) is str:
+    try:
+      dt = parse_iso8601(actual_val)
+    except ValueError:
+      dt = None
+    if dt is not None:
+      return dt
+
+  try:
+    return delorean.parse(actual_val).datetime
+  except (TypeError, ValueError):
+    return None
+
+
+def is_undefined(schema):
+  return type(schema) is district42.json_schema.types.Undefined
+
+
+def is_required(schema):
+  return 'required' not in schema._params or schema._params['required']
+
+
+def get_length_checks(schema):
+  checks = []
+  if 'length' in schema._params:
+    checks += [(ValidationLengthError, eq, schema._params['length'])]
+  if 'min_length' in schema._params:
+    checks += [(ValidationMinLengthError, ge, schema._params['min_length'])]
+  if 'max_length' in schema._params:
+    checks += [(ValidationMaxLengthError, le, schema._params['max_length'])]
+  return checks
+
+
+def freeze(value):
+  if type(value) is dict:
+    return frozenset((key, freeze(val)) for key, val in value.items())
+  if type(value) is list:
+    return tuple(freeze(item) for item in value)
+  return value
+
+
+_containers = (dict, list)
+
+
+def canonicalize(value):
+  # Scalars are tagged inline, which saves a call per leaf on the memo hot path
+  if type(value) is dict:
+    return (dict, frozenset([
+      (key, canonicalize(val) if (type(val) in _containers) else (type(val), val))
+      for key, val in value.items()
+    ]))
+  if type(value) is list:
+    return (list, tuple([
+      canonicalize(item) if (type(item) in _containers) else (type(item), item)
+      for item in value
+    ]))
+  return (type(value), value)
+
+
+def get_duplicates(array, predicate=None):
+  if predicate is None:
+    try:
+      groups = {}
+      for index, item in enumerate(array):
+        groups.setdefault(freeze(item), []).append(index)
+      return [indices for indices in groups.values() if len(indices) > 1]
+    except TypeError:
+      predicate = ne
+
+  duplicates = []
+  grouped = set()
+  for i in range(len(array)):
+    if i in grouped:
+      continue
+    indices = [i]
+    for j in range(i + 1, len(array)):
+      if (j not in grouped) and not predicate(array[i], array[j]):
+        indices += [j]
+    if len(indices) > 1:
+      grouped.update(indices)
+      duplicates += [indices]
+  return duplicates
+
+
+def is_unique(array, predicate=None):
+  if predicate is None:
+    try:
+      seen = set()
+      for item in array:
+        frozen = freeze(item)
+        if frozen in seen:
+          return False
+        seen.add(frozen)
+      return True
+    except TypeError:
+      predicate = ne
+
+  for i in range(len(array)):
+    for j in range(i + 1, len(array)):
+      if not predicate(array[i], array[j]):
+        return False
+  return True
+
+
+def get_subschemas(schema):
+  subschemas = []
+  if 'keys' in schema._params:
+    subschemas += list(schema._params['keys'].values())
+  for name in ('items', 'contains_all', 'options'):
+    if name in schema._params:
+      subschemas += list(schema._params[name])
+  for name in ('items_schema', 'contains', 'contains_one', 'contains_many'):
+    # string schemas keep their substring under 'contains' as well
+    if isinstance(schema._params.get(name), district42.json_schema.types.SchemaType):
+      subschemas += [schema._params[name]]
+  return subschemas
+
+
+def take_snapshot(schema):
+  return (schema, tuple(schema._params.items()),
+          tuple(take_snapshot(subschema) for subschema in get_subschemas(schema)))
+
+
+def is_snapshot_fresh(schema, snapshot):
+  # Schemas are mutable builders, so a snapshot holds every node and param
+  # value it was taken from and is compared by identity
+  expected_schema, params, subschemas = snapshot
+  if (schema is not expected_schema) or (len(schema._params) != len(params)):
+    return False
+  for name, value in params:
+    if schema._params.get(name, _missing) is not value:
+      return False
+  actual_subschemas = get_subschemas(schema)
+  if len(actual_subschemas) != len(subschemas):
+    return False
+  for subschema, subsnapshot in zip(actual_subschemas, subschemas):
+    if not is_snapshot_fresh(subschema, subsnapshot):
+      return False
+  return True
+
+
+_generation = 0
+
+
+def _touch():
+  global _generation
+  _generation += 1
+
+
+class TrackedParams(dict):
+
+  # Every write to a tracked schema bumps one counter, so cached compilations
+  # only walk their snapshot after some tracked schema has actually changed
+
+  __slots__ = ()
+
+  def __reduce__(self):
+    return (dict, (dict(self),))
+
+  def __setitem__(self, key, value):
+    _touch()
+    dict.__setitem__(self, key, value)
+
+  def __delitem__(self, key):
+    _touch()
+    dict.__delitem__(self, key)
+
+  def clear(self):
+    _touch()
+    dict.clear(self)
+
+  def pop(self, key, *default):
+    _touch()
+    return dict.pop(self, key, *default)
+
+  def popitem(self):
+    _touch()
+    return dict.popitem(self)
+
+  def setdefault(self, key, default=None):
+    _touch()
+    return dict.setdefault(self, key, default)
+
+  def update(self, *args, **kwargs):
+    _touch()
+    dict.update(self, *args, **kwargs)
+
+
+def track_params(schema):
+  if type(schema._params) is not TrackedParams:
+    schema._params = TrackedParams(schema._params)
+  for subschema in get_subschemas(schema):
+    track_params(subschema)
+
+
+class SchemaCache:
+
+  # Entries live outside the schemas so that schemas stay picklable, and are
+  # keyed by identity because SchemaType.__eq__ validates instead of comparing
+
+  def __init__(self):
+    self._entries = {}
+
+  def __discard(self, key, ref):
+    entry = self._entries.get(key)
+    if (entry is not None) and (entry[0] is ref):
+      del self._entries[key]
+
+  def __len__(self):
+    return len(self._entries)
+
+  def get(self, schema):
+    entry = self._entries.get(id(schema))
+    if (entry is None) or (entry[0]() is not schema):
+      return None
+    ref, generation, snapshot, value = entry
+    if generation != _generation:
+      if not is_snapshot_fresh(schema, (schema,) + snapshot):
+        return None
+      self._entries[id(schema)] = (ref, _generation, snapshot, value)
+    return value
+
+  def set(self, schema, value):
+    track_params(schema)
+    key = id(schema)
+    ref = weakref.ref(schema, lambda ref: self.__discard(key, ref))
+    # The root is left out of the snapshot so that the entry does not keep it alive
+    self._entries[key] = (ref, _generation, take_snapshot(schema)[1:], value)
+
+
+def has_predicate(schema):
+  if 'predicate' in schema._params:
+    return True
+  return any(has_predicate(subschema) for subschema in get_subschemas(schema))
+
+
+def is_discriminator(schema):
+  return (type(schema) is district42.json_schema.types.String) and \
+         (type(schema._params.get('value')) is str) and \
+         ('nullable' not in schema._params) and is_required(schema)
+
+
+def get_discriminator(options):
+  for option in options:
+    if (type(option) is not district42.json_schema.types.Object) or \
+       ('keys' not in option._params) or ('nullable' in option._params):
+      return None
+
+  for key in options[0]._params['keys']:
+    table = {}
+    for index, option in enumerate(options):
+      key_schema = option._params['keys'].get(key)
+      if (key_schema is None) or not is_discriminator(key_schema):
+        break
+      if key_schema._params['value'] in table:
+        break
+      table[key_schema._params['value']] = index
+    else:
+      return key, table
+  return None
+
+
+def get_discriminated_option(actual_val, discriminator):
+  key, table = discriminator
+  if type(actual_val) is dict:
+    value = actual_val.get(key)
+    if type(value) is str:
+      return table.get(value)
+  return None
+
+
+def get_accepted_types(schema):
+  types = district42.json_schema.types
+  schema_type = type(schema)
+
+  if schema_type is types.Null:
+    accepted_types = set()
+  elif schema_type in (types.Boolean, types.Number, types.String, types.Timestamp):
+    accepted_types = set(schema._valuable_types)
+  elif schema_type in (types.Array, types.ArrayOf):
+    accepted_types = {list}
+  elif schema_type is types.Object:
+    accepted_types = {dict}
+  elif schema_type is types.Any:
+    accepted_types = {bool, int, float, str, list, dict}
+  elif schema_type is types.Enum:
+    accepted_types = {type(x) for x in schema._params['enumerators']}
+  elif schema_type in (types.AnyOf, types.OneOf):
+    accepted_types = set()
+    for option in schema._params['options']:
+      option_types = get_accepted_types(option)
+      if option_types is None:
+        return None
+      accepted_types |= option_types
+  else:
+    return None
+
+  if (schema_type is types.Null) or ('nullable' in schema._params):
+    accepted_types.add(type(None))
+  return frozenset(accepted_types)
+
+
+def is_type_accepted(actual_val, accepted_types):
+  return (accepted_types is None) or (type(actual_val) in accepted_types)
+
+
+def get_candidate_options(actual_val, options, discriminator, option_types):
+  if discriminator is not None:
+    index = get_discriminated_option(actual_val, discriminator)
+    return [] if (index is None) else [options[index]]
+  return [option for option, accepted_types in zip(options, option_types)
+          if is_type_accepted(actual_val, accepted_types)]
+
+
+def get_error_priority(error):
+  if isinstance(error, ValidationLengthError):
+    return 3
+  elif isinstance(error, ValidationMissingKeyError) or isinstance(error, ValidationIndexError):
+    return 3
+  elif isinstance(error, ValidationTypeError):
+    return 4
+  elif isinstance(error, ValidationExtraKeyError) or isinstance(error, ValidationValueError):
+    return 5
+  elif isinstance(error, ValidationOccurrenceError):
+    return 5
+  else:
+    return 1
+
+
+def collect_errors(errors, limit=None):
+  collected = []
+  for error in errors:
+    collected += [error]
+    if (limit is not None) and (len(collected) > limit):
+      return None
+  return collected
+
+
+class BestMatch:
+
+  # Items are ranked by error count, then by error priority, so an item
+  # with more errors than the best one so far is never collected in full
+
+  def __init__(self):
+    self._best = None
+
+  def get_limit(self):
+    return None if (self._best is None) else self._best[0]
+
+  def add(self, index, errors):
+    if (errors is None) or (len(errors) == 0):
+      return
+    rank = (len(errors), -sum(get_error_priority(error) for error in errors), index)
+    if (self._best is None) or (rank < self._best[:3]):
+      self._best = rank + (errors,)
+
+  def to_dict(self, array):
+    if self._best is None:
+      return {'index': -1, 'item': None, 'errors': None}
+    *_, index, errors = self._best
+    return {'index': index, 'item': array[index], 'errors': errors}
+
+
+def iter_document_errors(expected, decode):
+  # null and other non-array documents are small, so they are validated as a whole
+  try:
+    actual = decode()
+  except ValueError as e:
+    yield ValidationDecodeError(Pointer(None), None, str(e))
+    return
+  yield from expected.iter_errors(Pointer(actual))
+
+
+def iter_streamed_array_errors(schema, count, items=None):
+  # Errors about a streamed array as a whole, once all its elements are read;
+  # items are only kept for unique arrays
+  root = Pointer(None)
+  for error_class, comparator, expected_length in get_length_checks(schema):
+    if not comparator(count, expected_length):
+      yield error_class(root, None, expected_length, 'list')
+
+  if items is not None:
+    for indices in get_duplicates(items, schema._params.get('predicate')):
+      yield ValidationUniquenessError(root, None, indices)
+
+
+def map_ordered(executor, fn, chunks, window, *args):
+  # Keeps at most `window` chunks in flight and yields their results in
+  # submission order, so memory does not grow with the input
+  pending = deque()
+  try:
+    for chunk in chunks:
+      pending.append(executor.submit(fn, chunk, *args))
+      if len(pending) >= window:
+        yield pending.popleft().result()
+    while len(pending) > 0:
+      yield pending.popleft().result()
+  finally:
+    for future in pending:
+      future.cancel()
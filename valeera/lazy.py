@@ -0,0 +1,294 @@
+import json
+import re
+from json.decoder import scanstring
+
+import district42.json_schema
+
+from .helpers import *
+
+_decode_value = json.JSONDecoder().raw_decode
+
+_whitespace_regex = re.compile(r'[ \t\n\r]*')
+
+_string_pattern = r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+
+_scalar_pattern = r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null'
+
+_token_regex = re.compile(r'[ \t\n\r]*(?:(' + _string_pattern + r')|(' + _scalar_pattern + r')|'
+                          r'([\[{])|([\]}])|(,)|(:))')
+
+# Skipped values nested up to this depth are matched by a single regex,
+# which is compiled on first use
+_regex_depth = 4
+
+_value_regex = None
+
+_string, _scalar, _opener, _closer, _comma, _colon = range(1, 7)
+
+# What may follow at each point of the grammar, and how a mismatch is reported
+_value = frozenset([_string, _scalar, _opener])
+_first_value = _value | {_closer}
+_key = frozenset([_string])
+_first_key = frozenset([_string, _closer])
+_delimiter = frozenset([_colon])
+_next = frozenset([_comma, _closer])
+
+_messages = {
+  _value: 'Expecting value',
+  _first_value: 'Expecting value',
+  _key: 'Expecting property name enclosed in double quotes',
+  _first_key: 'Expecting property name enclosed in double quotes',
+  _delimiter: 'Expecting \':\' delimiter',
+  _next: 'Expecting \',\' delimiter',
+}
+
+_closers = {'[': ']', '{': '}'}
+
+
+class RawValue:
+
+  __slots__ = ('_text', '_start', '_end')
+
+  def __init__(self, text, start, end):
+    self._text = text
+    self._start = start
+    self._end = end
+
+  def __repr__(self):
+    return self._text[self._start:self._end]
+
+  def decode(self):
+    # Decoding in place keeps error positions relative to the whole document
+    return _decode_value(self._text, self._start)[0]
+
+
+def materialize(value):
+  if type(value) is RawValue:
+    return value.decode()
+  if type(value) is dict:
+    return {key: materialize(val) for key, val in value.items()}
+  if type(value) is list:
+    return [materialize(item) for item in value]
+  return value
+
+
+def _skip_whitespace(text, idx):
+  return _whitespace_regex.match(text, idx).end()
+
+
+def _fail(message, text, idx):
+  raise json.JSONDecodeError(message, text, idx)
+
+
+def _compile_value_regex(depth):
+  ws = r'[ \t\n\r]*'
+  value = '(?:' + _string_pattern + '|' + _scalar_pattern + ')'
+  for _ in range(depth):
+    # An element is followed either by a comma and another element or by the closer
+    array = r'\[' + ws + '(?:' + value + ws + r'(?:,' + ws + r'(?!\])|(?=\])))*\]'
+    obj = r'\{' + ws + '(?:' + _string_pattern + ws + ':' + ws + value + ws + \
+          r'(?:,' + ws + r'(?!\})|(?=\})))*\}'
+    value = '(?:' + _string_pattern + '|' + _scalar_pattern + '|' + array + '|' + obj + ')'
+  return re.compile(value)
+
+
+def _skip(text, idx):
+  # Unreferenced values are checked against the JSON grammar, but nothing is
+  # built for them: tokens are walked only above the depth the value regex
+  # covers, or to find where a malformed value goes wrong
+  global _value_regex
+  if _value_regex is None:
+    _value_regex = _compile_value_regex(_regex_depth)
+
+  closers = []
+  expected = _value
+  while True:
+    if (expected is _value) or (expected is _first_value):
+      match = _value_regex.match(text, _skip_whitespace(text, idx))
+      if match is not None:
+        idx = match.end()
+        if len(closers) == 0:
+          return idx
+        expected = _next
+        continue
+
+    match = _token_regex.match(text, idx)
+    kind = None if (match is None) else match.lastindex
+    if kind not in expected:
+      idx = _skip_whitespace(text, idx)
+      if (text[idx:idx + 1] == '"') and (_string in expected):
+        # Raises the decoder's own message for the escape or character at fault
+        scanstring(text, idx + 1)
+      _fail(_messages[expected], text, idx)
+    idx = match.end()
+
+    if kind == _opener:
+      closers.append(_closers[text[idx - 1]])
+      expected = _first_key if (text[idx - 1] == '{') else _first_value
+      continue
+    if kind == _colon:
+      expected = _value
+      continue
+    if kind == _comma:
+      expected = _key if (closers[-1] == '}') else _value
+      continue
+    if kind == _closer:
+      if text[idx - 1] != closers.pop():
+        _fail(_messages[_next], text, idx - 1)
+    elif (kind == _string) and (expected in (_key, _first_key)):
+      expected = _delimiter
+      continue
+
+    # A whole value has been read
+    if len(closers) == 0:
+      return idx
+    expected = _next
+
+
+def _decode_raw(text, idx):
+  end = _skip(text, idx)
+  return RawValue(text, idx, end), end
+
+
+def _decode_array(text, idx, get_decoder):
+  array = []
+  idx = _skip_whitespace(text, idx + 1)
+  if text[idx:idx + 1] == ']':
+    return array, idx + 1
+
+  while True:
+    value, idx = get_decoder(len(array))(text, idx)
+    array.append(value)
+    idx = _skip_whitespace(text, idx)
+    char = text[idx:idx + 1]
+    if char == ']':
+      return array, idx + 1
+    if char != ',':
+      _fail('Expecting \',\' delimiter', text, idx)
+    idx = _skip_whitespace(text, idx + 1)
+
+
+class LazyDecoder(district42.json_schema.AbstractVisitor):
+
+  def visit_null(self, schema):
+    return _decode_value
+
+  def visit_boolean(self, schema):
+    return _decode_value
+
+  def visit_number(self, schema):
+    return _decode_value
+
+  def visit_string(self, schema):
+    return _decode_value
+
+  def visit_timestamp(self, schema):
+    return _decode_value
+
+  def visit_array(self, schema):
+    # Uniqueness and contains_all compare whole elements
+    if ('unique' in schema._params) or ('contains_all' in schema._params):
+      return _decode_value
+
+    if 'items' in schema._params:
+      decoders = [item.accept(self) for item in schema._params['items']]
+      get_decoder = lambda index: decoders[index] if index < len(decoders) else _decode_value
+    else:
+      item_decoder = _decode_raw
+      for name in ('contains', 'contains_one', 'contains_many'):
+        if name in schema._params:
+          item_decoder = schema._params[name].accept(self)
+      get_decoder = lambda index: item_decoder
+
+    def decode(text, idx):
+      if text[idx:idx + 1] != '[':
+        return _decode_value(text, idx)
+      return _decode_array(text, idx, get_decoder)
+
+    return decode
+
+  def visit_array_of(self, schema):
+    if 'unique' in schema._params:
+      return _decode_value
+
+    item_decoder = schema._params['items_schema'].accept(self)
+    get_decoder = lambda index: item_decoder
+
+    def decode(text, idx):
+      if text[idx:idx + 1] != '[':
+        return _decode_value(text, idx)
+      return _decode_array(text, idx, get_decoder)
+
+    return decode
+
+  def visit_object(self, schema):
+    decoders = {}
+    for key, item_schema in schema._params.get('keys', {}).items():
+      if not is_undefined(item_schema):
+        decoders[key] = item_schema.accept(self)
+
+    def decode(text, idx):
+      if text[idx:idx + 1] != '{':
+        return _decode_value(text, idx)
+
+      obj = {}
+      idx = _skip_whitespace(text, idx + 1)
+      if text[idx:idx + 1] == '}':
+        return obj, idx + 1
+
+      while True:
+        if text[idx:idx + 1] != '"':
+          _fail('Expecting property name enclosed in double quotes', text, idx)
+        key, idx = scanstring(text, idx + 1)
+        idx = _skip_whitespace(text, idx)
+        if text[idx:idx + 1] != ':':
+          _fail('Expecting \':\' delimiter', text, idx)
+        idx = _skip_whitespace(text, idx + 1)
+        obj[key], idx = decoders.get(key, _decode_raw)(text, idx)
+
+        idx = _skip_whitespace(text, idx)
+        char = text[idx:idx + 1]
+        if char == '}':
+          return obj, idx + 1
+        if char != ',':
+          _fail('Expecting \',\' delimiter', text, idx)
+        idx = _skip_whitespace(text, idx + 1)
+
+    return decode
+
+  def visit_any(self, schema):
+    return _decode_value
+
+  def visit_any_of(self, schema):
+    return _decode_value
+
+  def visit_one_of(self, schema):
+    return _decode_value
+
+  def visit_enum(self, schema):
+    return _decode_value
+
+  def visit_undefined(self, schema):
+    return _decode_raw
+
+
+_decoders = SchemaCache()
+
+
+def compile_decoder(schema):
+  decode = _decoders.get(schema)
+  if decode is None:
+    decode = schema.accept(LazyDecoder())
+    _decoders.set(schema, decode)
+  return decode
+
+
+def loads(content, schema):
+  if isinstance(content, (bytes, bytearray)):
+    content = content.decode(json.detect_encoding(content), 'surrogatepass')
+
+  value, end = compile_decoder(schema)(content, _skip_whitespace(content, 0))
+  end = _skip_whitespace(content, end)
+  if end != len(content):
+    _fail('Extra data', content, end)
+  return value
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from itertools import count
+
+import district42.json_schema
+
+from .helpers import canonicalize, get_subschemas, has_predicate
+
+
+def is_memoizable(schema):
+  # Only the innermost objects are memoized: they are the blocks that repeat
+  # across a payload, while keying an enclosing object would canonicalize its
+  # whole subtree on every visit for a value that rarely repeats
+  if has_predicate(schema):
+    return False
+  subschemas = get_subschemas(schema)
+  while len(subschemas) > 0:
+    subschema = subschemas.pop()
+    if type(subschema) is district42.json_schema.types.Object:
+      return False
+    subschemas += get_subschemas(subschema)
+  return True
+
+
+class Memo:
+
+  def __init__(self, maxsize=1024):
+    self.maxsize = maxsize
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()
+    self._nodes = count()
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __repr__(self):
+    return 'Memo(maxsize={}, hits={}, misses={})'.format(self.maxsize, self.hits, self.misses)
+
+  def __get_key(self, node, actual_val):
+    try:
+      key = (node, canonicalize(actual_val))
+      hash(key)
+    except TypeError:
+      return None
+    return key
+
+  def lookup(self, key):
+    result = self._entries.get(key)
+    if result is None:
+      self.misses += 1
+      return None
+    self._entries.move_to_end(key)
+    self.hits += 1
+    return result
+
+  def store(self, key, result):
+    self._entries[key] = result
+    self._entries.move_to_end(key)
+    if len(self._entries) > self.maxsize:
+      self._entries.popitem(last=False)
+
+  def stats(self):
+    return {
+      'hits': self.hits,
+      'misses': self.misses,
+      'size': len(self._entries),
+      'maxsize': self.maxsize,
+    }
+
+  def clear(self):
+    self._entries.clear()
+    self.hits = 0
+    self.misses = 0
+
+  def memoize_check(self, schema, check):
+    # Only successful validations are remembered: errors carry the pointer of
+    # the value they were found at, so a failing subtree is always re-validated
+    if not is_memoizable(schema):
+      return check
+    node = next(self._nodes)
+
+    def check_memoized(pointer):
+      key = self.__get_key(node, pointer.value())
+      if key is None:
+        yield from check(pointer)
+        return
+      if self.lookup(key):
+        return
+
+      is_valid = True
+      for error in check(pointer):
+        is_valid = False
+        yield error
+      if is_valid:
+        self.store(key, True)
+
+    return check_memoized
+
+  def memoize_predicate(self, schema, is_valid):
+    if not is_memoizable(schema):
+      return is_valid
+    node = next(self._nodes)
+
+    def is_valid_memoized(actual_val):
+      key = self.__get_key(node, actual_val)
+      if key is None:
+        return is_valid(actual_val)
+      result = self.lookup(key)
+      if result is None:
+        result = is_valid(actual_val)
+        self.store(key, result)
+      return result
+
+    return is_valid_memoized
@@ -0,0 +1,64 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .compiler import CompiledSchema, compile
+from .formatter import Formatter
+from .helpers import map_ordered
+from .validator import Validator
+
+_worker = None
+
+
+def _serialize(error, formatter):
+  return (error.path, error.format(formatter))
+
+
+def _init_worker(schema_dump, formatter, fail_fast, max_errors):
+  # Compiled closures cannot be pickled, so every worker receives the schema
+  # once and compiles it for all the chunks it will validate
+  global _worker
+  _worker = (compile(pickle.loads(schema_dump)), formatter,
+             Validator(None, fail_fast, max_errors))
+
+
+def _validate_chunk(chunk, failures_only):
+  offset, actuals = chunk
+  expected, formatter, validator = _worker
+  results = validator.validate_many(actuals, expected, failures_only)
+  if failures_only:
+    return [offset + index for index in results]
+  return [[_serialize(error, formatter) for error in errors] for errors in results]
+
+
+def _iter_chunks(actuals, chunksize):
+  iterator = iter(actuals)
+  offset = 0
+  while True:
+    chunk = list(islice(iterator, chunksize))
+    if len(chunk) == 0:
+      break
+    yield offset, chunk
+    offset += len(chunk)
+
+
+def validate_many(actuals, schema, workers = None, chunksize = 1000, formatter = None,
+                  fail_fast = False, max_errors = None, failures_only = False):
+  if isinstance(schema, CompiledSchema):
+    schema = schema.schema
+  if formatter is None:
+    formatter = Formatter()
+  if workers is None:
+    workers = os.cpu_count() or 1
+
+  initargs = (pickle.dumps(schema), formatter, fail_fast, max_errors)
+  executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs)
+  chunks = map_ordered(executor, _validate_chunk, _iter_chunks(actuals, chunksize),
+                      workers * 2, failures_only)
+  try:
+    for results in chunks:
+      yield from results
+  finally:
+    chunks.close()
+    executor.shutdown()
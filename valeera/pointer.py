@@ -1,32 +1,68 @@
+_missing = object()
+
+
 class Pointer:
 
   root = '#'
 
+  __slots__ = ('_node', '_parent', '_step')
+
   def __init__(self, dictionary, path = None):
-    self._dictionary = dictionary
-    self._path = [] if path is None else path
+    self._node = dictionary
+    self._parent = None
+    self._step = None
+
+    if path:
+      parent = Pointer(dictionary)
+      for step in path[:-1]:
+        parent = parent.move(step)
+      self._node = parent.__resolve(path[-1])
+      self._parent = parent
+      self._step = path[-1]
+
+  def __resolve(self, step):
+    node = self._node
+    if node is _missing:
+      return _missing
+    try:
+      return node[step]
+    except (KeyError, IndexError, TypeError):
+      return _missing
+
+  def __get_missing_error(self):
+    pointer = self
+    while pointer._parent._node is _missing:
+      pointer = pointer._parent
+    if type(pointer._step) is int:
+      return IndexError(pointer._step)
+    return KeyError(pointer._step)
 
   def move(self, step):
-    return Pointer(self._dictionary, self._path + [step])
+    return self.attach(step, self.__resolve(step))
+
+  def attach(self, step, value):
+    pointer = Pointer.__new__(Pointer)
+    pointer._node = value
+    pointer._parent = self
+    pointer._step = step
+    return pointer
 
   def has_value(self):
-    node = self._dictionary
-    for step in self._path:
-      if (type(step) is int) and (step >= len(node)):
-        return False
-      elif (type(step) is str) and (step not in node):
-        return False
-      node = node[step]
-    return True
+    return self._node is not _missing
 
   def value(self):
-    node = self._dictionary
-    for step in self._path:
-      node = node[step]
-    return node
+    if self._node is _missing:
+      raise self.__get_missing_error()
+    return self._node
 
   def path(self):
+    steps = []
+    pointer = self
+    while pointer._parent is not None:
+      steps.append(pointer._step)
+      pointer = pointer._parent
+
     path = self.root
-    for step in self._path:
+    for step in reversed(steps):
       path += ('[' + str(step) + ']') if (type(step) is int) else ('.' + step)
     return path
@@ -0,0 +1,396 @@
+from operator import eq, ge, le
+
+import district42.json_schema
+
+from .helpers import *
+
+
+class PredicateCompiler(district42.json_schema.AbstractVisitor):
+
+  def __init__(self, memo = None):
+    self._memo = memo
+
+  def __memoize(self, schema, is_valid):
+    if self._memo is None:
+      return is_valid
+    return self._memo.memoize_predicate(schema, is_valid)
+
+  def __compile_length(self, schema):
+    checks = []
+    if 'length' in schema._params:
+      checks += [(eq, schema._params['length'])]
+    if 'min_length' in schema._params:
+      checks += [(ge, schema._params['min_length'])]
+    if 'max_length' in schema._params:
+      checks += [(le, schema._params['max_length'])]
+
+    if len(checks) == 0:
+      return None
+
+    def is_length_valid(actual_val):
+      length = len(actual_val)
+      for comparator, expected_length in checks:
+        if not comparator(length, expected_length):
+          return False
+      return True
+
+    return is_length_valid
+
+  def __compile_uniqueness(self, schema):
+    if 'unique' not in schema._params:
+      return None
+
+    predicate = schema._params.get('predicate')
+
+    def is_array_unique(actual_val):
+      return is_unique(actual_val, predicate)
+
+    return is_array_unique
+
+  def visit_null(self, schema):
+    def is_valid(actual_val):
+      return actual_val is None
+
+    return is_valid
+
+  def visit_boolean(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+
+    def is_valid(actual_val):
+      if type(actual_val) not in valid_types:
+        return is_nullable and actual_val is None
+      return (not has_value) or (actual_val == expected_val)
+
+    return is_valid
+
+  def visit_number(self, schema):
+    if 'float' in schema._params:
+      return self.__compile_float(schema)
+
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+    has_min_value = 'min_value' in schema._params
+    min_value = schema._params.get('min_value')
+    has_max_value = 'max_value' in schema._params
+    max_value = schema._params.get('max_value')
+    has_multiple = 'multiple' in schema._params
+    multiple = schema._params.get('multiple')
+
+    def is_valid(actual_val):
+      if type(actual_val) not in valid_types:
+        return is_nullable and actual_val is None
+      if has_value and actual_val != expected_val:
+        return False
+      if has_min_value and actual_val < min_value:
+        return False
+      if has_max_value and actual_val > max_value:
+        return False
+      if has_multiple and actual_val % multiple != 0:
+        return False
+      return True
+
+    return is_valid
+
+  def __compile_float(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    places = schema._params['precision'] if ('precision' in schema._params) else 9
+
+    def quantize_param(name):
+      if name in schema._params:
+        return quantize(schema._params[name], places)
+      return None
+
+    expected_decimal = quantize_param('value')
+    min_decimal = quantize_param('min_value')
+    max_decimal = quantize_param('max_value')
+
+    def is_valid(actual_val):
+      if type(actual_val) not in valid_types:
+        return is_nullable and actual_val is None
+      actual_decimal = quantize(actual_val, places)
+      if (expected_decimal is not None) and (actual_decimal != expected_decimal):
+        return False
+      if (min_decimal is not None) and (actual_decimal < min_decimal):
+        return False
+      if (max_decimal is not None) and (actual_decimal > max_decimal):
+        return False
+      return True
+
+    return is_valid
+
+  def visit_string(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    has_value = 'value' in schema._params
+    expected_val = schema._params.get('value')
+    is_uri = 'uri' in schema._params
+    pattern = get_pattern(schema)
+    is_pattern_match = None if pattern == any_pattern else compile_pattern(pattern).match
+    has_substring = 'contains' in schema._params
+    substring = schema._params.get('contains')
+    has_numeric_min = 'numeric_min' in schema._params
+    numeric_min = schema._params.get('numeric_min')
+    has_numeric_max = 'numeric_max' in schema._params
+    numeric_max = schema._params.get('numeric_max')
+    is_length_valid = self.__compile_length(schema)
+
+    def is_valid(actual_val):
+      if type(actual_val) not in valid_types:
+        return is_nullable and actual_val is None
+      if has_value and actual_val != expected_val:
+        return False
+      if is_uri and not is_uri_valid(actual_val):
+        return False
+      if is_pattern_match and not is_pattern_match(actual_val):
+        return False
+      if has_substring and substring not in actual_val:
+        return False
+      if has_numeric_min and int(actual_val) < numeric_min:
+        return False
+      if has_numeric_max and int(actual_val) > numeric_max:
+        return False
+      if is_length_valid and not is_length_valid(actual_val):
+        return False
+      return True
+
+    return is_valid
+
+  def visit_timestamp(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = tuple(schema._valuable_types)
+    timestamp_format = schema._params.get('format')
+    has_value = 'value' in schema._params
+    expected_val = schema._params['value'].datetime if has_value else None
+    has_min_value = 'min_value' in schema._params
+    min_value = schema._params['min_value'].datetime if has_min_value else None
+    has_max_value = 'max_value' in schema._params
+    max_value = schema._params['max_value'].datetime if has_max_value else None
+    is_iso = 'iso' in schema._params
+
+    def is_valid(actual_val):
+      if type(actual_val) not in valid_types:
+        return is_nullable and actual_val is None
+
+      timestamp = parse_timestamp(actual_val, timestamp_format)
+      if timestamp is None:
+        return False
+      if has_value and timestamp != expected_val:
+        return False
+      if has_min_value and timestamp < min_value:
+        return False
+      if has_max_value and timestamp > max_value:
+        return False
+
+      if is_iso:
+        return is_iso8601(actual_val)
+      elif timestamp_format is not None:
+        return actual_val == timestamp.strftime(timestamp_format)
+      return True
+
+    return is_valid
+
+  def visit_array(self, schema):
+    is_nullable = 'nullable' in schema._params
+    is_length_valid = self.__compile_length(schema)
+    is_array_unique = self.__compile_uniqueness(schema)
+
+    is_items_valid = None
+    if 'items' in schema._params:
+      items = [item.accept(self) for item in schema._params['items']]
+
+      def is_items_valid(actual_val):
+        if len(actual_val) != len(items):
+          return False
+        for item_is_valid, item in zip(items, actual_val):
+          if not item_is_valid(item):
+            return False
+        return True
+
+    elif 'contains' in schema._params:
+      item_is_valid = schema._params['contains'].accept(self)
+
+      def is_items_valid(actual_val):
+        for item in actual_val:
+          if item_is_valid(item):
+            return True
+        return False
+
+    elif ('contains_one' in schema._params) or ('contains_many' in schema._params):
+      if 'contains_one' in schema._params:
+        item_is_valid = schema._params['contains_one'].accept(self)
+        is_count_valid = lambda count: count == 1
+      else:
+        item_is_valid = schema._params['contains_many'].accept(self)
+        is_count_valid = lambda count: count >= 2
+
+      def is_items_valid(actual_val):
+        count = 0
+        for item in actual_val:
+          if item_is_valid(item):
+            count += 1
+            if count == 2:
+              break
+        return is_count_valid(count)
+
+    elif 'contains_all' in schema._params:
+      items = [item.accept(self) for item in schema._params['contains_all']]
+
+      def is_items_valid(actual_val):
+        missing = items
+        for item in actual_val:
+          if len(missing) == 0:
+            break
+          missing = [item_is_valid for item_is_valid in missing if not item_is_valid(item)]
+        return len(missing) == 0
+
+    def is_valid(actual_val):
+      if type(actual_val) is not list:
+        return is_nullable and actual_val is None
+      if is_items_valid and not is_items_valid(actual_val):
+        return False
+      if is_length_valid and not is_length_valid(actual_val):
+        return False
+      if is_array_unique and not is_array_unique(actual_val):
+        return False
+      return True
+
+    return is_valid
+
+  def visit_array_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    item_is_valid = schema._params['items_schema'].accept(self)
+    is_length_valid = self.__compile_length(schema)
+    is_array_unique = self.__compile_uniqueness(schema)
+
+    def is_valid(actual_val):
+      if type(actual_val) is not list:
+        return is_nullable and actual_val is None
+      for item in actual_val:
+        if not item_is_valid(item):
+          return False
+      if is_length_valid and not is_length_valid(actual_val):
+        return False
+      if is_array_unique and not is_array_unique(actual_val):
+        return False
+      return True
+
+    return is_valid
+
+  def visit_object(self, schema):
+    is_nullable = 'nullable' in schema._params
+
+    keys = None
+    if 'keys' in schema._params:
+      keys = []
+      for key, item_schema in schema._params['keys'].items():
+        if is_undefined(item_schema):
+          keys += [(key, None, False)]
+        else:
+          keys += [(key, item_schema.accept(self), is_required(item_schema))]
+
+    is_strict = (keys is not None) and ('strict' in schema._params)
+    expected_keys = schema._params.get('keys')
+    is_length_valid = self.__compile_length(schema)
+
+    def is_valid(actual_val):
+      if type(actual_val) is not dict:
+        return is_nullable and actual_val is None
+
+      if keys is not None:
+        for key, item_is_valid, required in keys:
+          if key in actual_val:
+            if (item_is_valid is None) or not item_is_valid(actual_val[key]):
+              return False
+          elif required:
+            return False
+
+      if is_strict:
+        for key in actual_val:
+          if key not in expected_keys:
+            return False
+
+      if is_length_valid and not is_length_valid(actual_val):
+        return False
+      return True
+
+    return self.__memoize(schema, is_valid)
+
+  def visit_any(self, schema):
+    is_nullable = 'nullable' in schema._params
+    valid_types = (bool, int, float, str, list, dict)
+
+    def is_valid(actual_val):
+      if type(actual_val) in valid_types:
+        return True
+      return is_nullable and actual_val is None
+
+    return is_valid
+
+  def visit_any_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    options = [(get_accepted_types(option), option.accept(self))
+               for option in schema._params['options']]
+    discriminator = get_discriminator(schema._params['options'])
+
+    def is_valid(actual_val):
+      if is_nullable and actual_val is None:
+        return True
+      if discriminator is not None:
+        index = get_discriminated_option(actual_val, discriminator)
+        return (index is not None) and options[index][1](actual_val)
+      for accepted_types, option_is_valid in options:
+        if is_type_accepted(actual_val, accepted_types) and option_is_valid(actual_val):
+          return True
+      return False
+
+    return is_valid
+
+  def visit_one_of(self, schema):
+    is_nullable = 'nullable' in schema._params
+    options = [(get_accepted_types(option), option.accept(self))
+               for option in schema._params['options']]
+    discriminator = get_discriminator(schema._params['options'])
+
+    def is_valid(actual_val):
+      if is_nullable and actual_val is None:
+        return True
+      if discriminator is not None:
+        index = get_discriminated_option(actual_val, discriminator)
+        return (index is not None) and options[index][1](actual_val)
+      count = 0
+      for accepted_types, option_is_valid in options:
+        if is_type_accepted(actual_val, accepted_types) and option_is_valid(actual_val):
+          count += 1
+          if count == 2:
+            return False
+      return count == 1
+
+    return is_valid
+
+  def visit_enum(self, schema):
+    is_nullable = 'nullable' in schema._params
+    enumerators = schema._params['enumerators']
+
+    def is_valid(actual_val):
+      if any(type(x) == type(actual_val) and x == actual_val for x in enumerators):
+        return True
+      return is_nullable and actual_val is None
+
+    return is_valid
+
+
+_predicates = SchemaCache()
+
+
+def compile_predicate(schema):
+  is_valid = _predicates.get(schema)
+  if is_valid is None:
+    is_valid = schema.accept(PredicateCompiler())
+    _predicates.set(schema, is_valid)
+  return is_valid
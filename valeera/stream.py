@@ -0,0 +1,185 @@
+import codecs
+import json
+from itertools import islice
+
+import district42.json_schema
+
+from .compiler import CompiledSchema, compile
+from .errors import *
+from .helpers import iter_document_errors, iter_streamed_array_errors
+from .pointer import Pointer
+from .validator import Validator
+
+
+def iter_lines(fileobj, buffer_size = 1 << 20):
+  # Reads the stream in large chunks and keeps only the unfinished line between
+  # them, so memory is bounded by the buffer and the longest line
+  line_number = 0
+  rest = b''
+  while True:
+    chunk = fileobj.read(buffer_size)
+    if not chunk:
+      break
+    lines = (rest + chunk).split(b'\n')
+    rest = lines.pop()
+    for line in lines:
+      line_number += 1
+      yield line_number, line
+  if rest:
+    yield line_number + 1, rest
+
+
+def _decode(line, pointer):
+  try:
+    return json.loads(line), None
+  except ValueError as e:
+    return None, ValidationDecodeError(pointer, line, str(e))
+
+
+def validate_lines(fileobj, schema, formatter = None, fail_fast = False, max_errors = None,
+                   buffer_size = 1 << 20):
+  expected = schema if isinstance(schema, CompiledSchema) else compile(schema)
+  validator = Validator(formatter, fail_fast, max_errors)
+
+  for line_number, line in iter_lines(fileobj, buffer_size):
+    if not line.strip():
+      continue
+
+    actual, error = _decode(line, Pointer(line))
+    if error is not None:
+      yield line_number, [error.format(formatter) if formatter else error]
+    elif not expected.is_valid(actual):
+      yield line_number, validator.validate(actual, expected).errors()
+
+
+class _TextBuffer:
+
+  whitespace = ' \t\n\r'
+  number_chars = '0123456789.eE+-'
+
+  def __init__(self, fileobj, buffer_size):
+    self._fileobj = fileobj
+    self._buffer_size = buffer_size
+    self._decoder = codecs.getincrementaldecoder('utf-8')()
+    self.text = ''
+    self.pos = 0
+    self.offset = 0
+    self.is_eof = False
+
+  def __fill(self, size):
+    # Only the unconsumed tail is kept, so the buffer never outgrows
+    # the element being decoded plus one read
+    chunk = self._fileobj.read(size)
+    self.is_eof = not chunk
+    self.text = self.text[self.pos:] + self._decoder.decode(chunk, self.is_eof)
+    self.offset += self.pos
+    self.pos = 0
+
+  def __is_cut(self, error):
+    # Values cut by the end of the buffer fail at its last few characters,
+    # except strings, which fail where they start
+    return (error.pos + len('false') >= len(self.text)) or \
+           error.msg.startswith('Unterminated string')
+
+  def peek(self):
+    while True:
+      while (self.pos < len(self.text)) and (self.text[self.pos] in self.whitespace):
+        self.pos += 1
+      if (self.pos < len(self.text)) or self.is_eof:
+        break
+      self.__fill(self._buffer_size)
+    return self.text[self.pos:self.pos + 1]
+
+  def tell(self):
+    return self.offset + self.pos
+
+  def advance(self):
+    self.pos += 1
+
+  def decode_value(self, decoder):
+    size = self._buffer_size
+    while True:
+      try:
+        value, end = decoder.raw_decode(self.text, self.pos)
+        # A number cut by the end of the buffer parses as a shorter one,
+        # so it is accepted only once the next character cannot continue it
+        if self.is_eof or ((end < len(self.text)) and
+                           (self.text[end] not in self.number_chars)):
+          self.pos = end
+          return value
+      except json.JSONDecodeError as e:
+        if self.is_eof or not self.__is_cut(e):
+          raise ValueError('{} (char {})'.format(e.msg, self.offset + e.pos)) from None
+      self.__fill(size)
+      size *= 2
+
+  def read_rest(self):
+    while not self.is_eof:
+      self.__fill(self._buffer_size)
+    return self.text[self.pos:]
+
+
+def _iter_array_errors(fileobj, expected, buffer_size):
+  decoder = json.JSONDecoder()
+  buffer = _TextBuffer(fileobj, buffer_size)
+  root = Pointer(None)
+
+  if buffer.peek() != '[':
+    yield from iter_document_errors(expected, lambda: decoder.decode(buffer.read_rest()))
+    return
+
+  items_schema = expected.schema._params['items_schema']
+  item_expected = compile(items_schema, expected._memo)
+  # Uniqueness needs every element, so only unique arrays are kept in memory
+  items = [] if 'unique' in expected.schema._params else None
+
+  buffer.advance()
+  count = 0
+  while True:
+    char = buffer.peek()
+    if char == ']':
+      buffer.advance()
+      break
+    if count > 0:
+      if char != ',':
+        message = 'Expecting \',\' delimiter' if char else 'Unexpected end of data'
+        message = '{} (char {})'.format(message, buffer.tell())
+        yield ValidationDecodeError(root.attach(count, None), None, message)
+        return
+      buffer.advance()
+      buffer.peek()
+
+    try:
+      actual_val = buffer.decode_value(decoder)
+    except ValueError as e:
+      yield ValidationDecodeError(root.attach(count, None), None, str(e))
+      return
+
+    if not item_expected.is_valid(actual_val):
+      yield from item_expected.iter_errors(root.attach(count, actual_val))
+    if items is not None:
+      items += [actual_val]
+    count += 1
+
+  if buffer.peek() != '':
+    yield ValidationDecodeError(root, None, 'Extra data (char {})'.format(buffer.tell()))
+    return
+
+  yield from iter_streamed_array_errors(expected.schema, count, items)
+
+
+def validate_array(fileobj, schema, formatter = None, fail_fast = False, max_errors = None,
+                   buffer_size = 1 << 20):
+  expected = schema if isinstance(schema, CompiledSchema) else compile(schema)
+  if type(expected.schema) is not district42.json_schema.types.ArrayOf:
+    raise TypeError('validate_array expects schema.array.of(...), {!r} given'.format(
+                    expected.schema))
+
+  errors = _iter_array_errors(fileobj, expected, buffer_size)
+  if fail_fast:
+    errors = islice(errors, 1)
+  elif max_errors is not None:
+    errors = islice(errors, max_errors)
+
+  # A generator expression, so that the schema is checked before the first read
+  return (error.format(formatter) if formatter else error for error in errors)
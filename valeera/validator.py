@@ -1,19 +1,114 @@
+import asyncio
+from itertools import islice
+
 from .abstract_validator import AbstractValidator
+from .compiler import CompiledSchema, compile
+from .cooperative import compile_cooperative, tick
+from .errors import ValidationDecodeError
+from .lazy import loads, materialize
 from .pointer import Pointer
+from .predicate_compiler import compile_predicate
 from .validator_visitor import ValidatorVisitor
 
 
 class Validator(AbstractValidator):
 
-  def __init__(self, formatter = None):
+  def __init__(self, formatter = None, fail_fast = False, max_errors = None):
     super().__init__()
     self._formatter = formatter
+    self._fail_fast = fail_fast
+    self._max_errors = max_errors
 
-  def errors(self):
+  def __get_limit(self):
+    if self._fail_fast:
+      return 1
+    elif self._max_errors is not None:
+      return self._max_errors + 1
+    return None
+
+  def __limit(self, errors):
+    limit = self.__get_limit()
+    if limit is not None:
+      errors = islice(errors, limit)
+    errors = list(errors)
+
+    truncated = (self._max_errors is not None) and (len(errors) > self._max_errors)
+    return (errors[:self._max_errors] if truncated else errors), truncated
+
+  def __format(self, errors):
     if self._formatter is None:
-      return self._errors
-    return [error.format(self._formatter) for error in self._errors]
+      return errors
+    return [error.format(self._formatter) for error in errors]
+
+  def errors(self):
+    return self.__format(self._errors)
+
+  def iter_errors(self, actual, expected):
+    if isinstance(expected, CompiledSchema):
+      return expected.iter_errors(Pointer(actual))
+    return expected.accept(ValidatorVisitor(), Pointer(actual))
 
   def validate(self, actual, expected):
-    self._errors = expected.accept(ValidatorVisitor(), Pointer(actual))
+    self._errors, self._truncated = self.__limit(self.iter_errors(actual, expected))
     return self
+
+  def validate_json(self, content, expected):
+    schema = expected.schema if isinstance(expected, CompiledSchema) else expected
+    try:
+      actual = loads(content, schema)
+      if self.is_valid(actual, expected):
+        self._errors, self._truncated = [], False
+        return self
+      # Errors show the values they were found at, so the skipped ones are decoded first
+      actual = materialize(actual)
+    except ValueError as e:
+      # The document is left out of the error, as it may be arbitrarily large
+      error = ValidationDecodeError(Pointer(None), None, str(e))
+      self._errors, self._truncated = [error], False
+      return self
+
+    return self.validate(actual, expected)
+
+  async def avalidate(self, actual, expected, yield_every = 1000, executor = None,
+                      offload_above = None):
+    if (offload_above is not None) and (type(actual) in (list, dict)) and \
+       (len(actual) > offload_above):
+      loop = asyncio.get_running_loop()
+      return await loop.run_in_executor(executor, self.validate, actual, expected)
+
+    limit = self.__get_limit()
+    errors = []
+    nodes = 0
+    for error in compile_cooperative(expected).iter_errors(Pointer(actual)):
+      if error is tick:
+        nodes += 1
+        if nodes % yield_every == 0:
+          await asyncio.sleep(0)
+        continue
+      errors.append(error)
+      if len(errors) == limit:
+        break
+
+    self._errors, self._truncated = self.__limit(errors)
+    return self
+
+  def validate_many(self, actuals, expected, failures_only = False):
+    if not isinstance(expected, CompiledSchema):
+      expected = compile(expected)
+
+    results = []
+    for index, actual in enumerate(actuals):
+      if expected.is_valid(actual):
+        if not failures_only:
+          results.append([])
+      elif failures_only:
+        results.append(index)
+      else:
+        errors, _ = self.__limit(expected.iter_errors(Pointer(actual)))
+        results.append(self.__format(errors))
+    return results
+
+  def is_valid(self, actual, expected):
+    if isinstance(expected, CompiledSchema):
+      return expected.is_valid(actual)
+    return compile_predicate(expected)(actual)